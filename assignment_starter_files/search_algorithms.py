@@ -269,13 +269,13 @@ class GreedyBestSearch(InformedSearchAgent):
     """
     frontier : List[Tuple[float, StateNode]]
 
-    def __init__(self, heuristic : Callable[[StateNode],float]):
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, **kwargs):
         """ Initialize self.total_extends and self.total_enqueues(done in super().__init__())
         Create an empty frontier queue.
         Also takes the heuristic function to be used as an estimate
         of the remaining cost to goal. 
         """
-        super().__init__(heuristic)
+        super().__init__(heuristic, *args, **kwargs)
         # TODO initiate frontier data structure
 
 
@@ -10,6 +10,8 @@ PRINT_AS_PATH = True
 ### A generic graph traversal problem. 
 
 class GraphAction(Action):
+    __slots__ = ("state",)
+
     def __init__(self, state : str):
         self.state = str(state)
 
@@ -20,16 +22,43 @@ class GraphAction(Action):
     def __eq__(self, o) -> bool:
         return o.state == self.state
 
+class GraphProblem:
+    """ The data of a graph environment that is the same for every state: the graph itself, and the heuristic values.
+    All the GraphStates of an environment share a single GraphProblem, rather than each holding the data.
+    """
+    __slots__ = ("graph", "heuristics", "reverse_graph")
+    # The graph maps states to neighbor states, which map to their transition cost.
+    # If the Dict maps to None, then it is a goal state.
+    graph : OrderedDict[str, Union[None,OrderedDict[str, float]]]
+    heuristics : Dict[str, float]
+    # The graph with every transition reversed (mapping states to the states that lead to them), made when first needed.
+    reverse_graph : Optional[Dict[str, Dict[str, float]]]
+
+    def __init__(self, graph : Dict[str, Union[None,Dict[str, float]]], heuristics : Dict[str, float]):
+        self.graph = graph
+        self.heuristics = heuristics
+        self.reverse_graph = None
+
+    def get_reverse_graph(self) -> Dict[str, Dict[str, float]]:
+        """ Returns the reverse graph, which maps each state to the states with a transition to it, and that transition's cost. """
+        if self.reverse_graph is None:
+            reverse_graph : Dict[str, Dict[str, float]] = OrderedDict((state, OrderedDict()) for state in self.graph)
+            for state, transitions in self.graph.items():
+                if transitions is not None:
+                    for to_state, cost in transitions.items():
+                        reverse_graph.setdefault(to_state, OrderedDict())[state] = cost
+            self.reverse_graph = reverse_graph
+        return self.reverse_graph
+
+
 class GraphState(StateNode):
     """ A state node for the graph environment. """
 
     """ Type Hints allow for the optional type declaration of "instance variables" this way, like Java.
         It is recommended you list them here:
     """
-    # The graph maps states to neighbor states, which map to their transition cost.
-    # If the Dict maps to None, then it is a goal state.
-    graph : OrderedDict[str, Union[None,OrderedDict[str, float]]]
-    heuristics : Dict[str, float]
+    __slots__ = ("problem", "this_state")
+    problem : GraphProblem
     this_state : str
     
     @staticmethod
@@ -55,8 +84,7 @@ class GraphState(StateNode):
                         transitions[to_state.strip()] = float(cost)
                 graph[state] = transitions
             init = file.readline()
-            return GraphState(graph = graph,
-                            heuristics = heuristics,
+            return GraphState(problem = GraphProblem(graph, heuristics),
                             this_state = init,
                             parent = None,
                             last_action = None,
@@ -65,8 +93,7 @@ class GraphState(StateNode):
 
     #Override
     def __init__(self, 
-            graph :  Dict[str, Union[None,Dict[str, float]]],
-            heuristics : Dict[str, float],
+            problem : GraphProblem,
             this_state : str,
             parent : Optional[StateNode], 
             last_action: Optional[GraphAction], 
@@ -77,16 +104,25 @@ class GraphState(StateNode):
         
         Keyword Arguments:
         All the arguments for StateNode's __init__; Use super.__init__() to call this function and pass appropriate parameters.
-        tiles -- a tuple grid of integers representing the position of different numbered tiles
-        empty_pos -- a coordinate indicating the position of the empty spot (tile 0)
+        problem -- the GraphProblem (the graph and heuristic values) shared by all states
+        this_state -- the name of the graph state this node is at
         """
         super().__init__(parent = parent, last_action = last_action, depth = depth, path_cost = path_cost)
-        self.graph = graph
-        self.heuristics = heuristics
+        self.problem = problem
         self.this_state = this_state
 
     """ Additional accessor methods - needed for the GUI"""
 
+    @property
+    def graph(self) -> Dict[str, Union[None,Dict[str, float]]]:
+        """The graph, mapping states to neighbor states and their transition costs (kept in the shared GraphProblem)"""
+        return self.problem.graph
+
+    @property
+    def heuristics(self) -> Dict[str, float]:
+        """The heuristic value of each state (kept in the shared GraphProblem)"""
+        return self.problem.heuristics
+
     def get_size(self) -> int:
         return len(self.graph)
 
@@ -166,8 +202,7 @@ class GraphState(StateNode):
 
         -- action is assumed legal (is_legal_action called before), but a ValueError may be passed for illegal actions if desired.
         """
-        return GraphState(graph = self.graph,
-                        heuristics = self.heuristics,
+        return GraphState(problem = self.problem,
                         this_state = action.state,
                         parent = self,
                         last_action = action,
@@ -175,8 +210,36 @@ class GraphState(StateNode):
                         path_cost = self.path_cost + self.graph[self.this_state][action.state],
                         )
 
+    # Override
+    def get_goal_states(self) -> Iterable[GraphState]:
+        """Returns a state for each goal in the graph."""
+        for state, transitions in self.graph.items():
+            if transitions is None:
+                yield GraphState(problem = self.problem,
+                                this_state = state,
+                                parent = None,
+                                last_action = None,
+                                depth = 0,
+                                path_cost = 0.0)
+
+    # Override
+    def get_previous_states(self) -> Iterable[GraphState]:
+        """Returns the states with a transition to this one, using the problem's reverse graph.
+        Their last_action is that transition (to this state).
+        """
+        for from_state, cost in self.problem.get_reverse_graph()[self.this_state].items():
+            yield GraphState(problem = self.problem,
+                            this_state = from_state,
+                            parent = self,
+                            last_action = GraphAction(self.this_state),
+                            depth = self.depth + 1,
+                            path_cost = self.path_cost + cost,
+                            )
+
     def __lt__(self, other) -> bool:
         """
         For tiebreakers, apply priority in alphabetical order.
+        Only graph_search_algorithms (used by graph_gui) compares states in its priority queues;
+        the frontiers in search_algorithms break ties by their tie-break policy instead (see TIE_BREAKS).
         """
         return self.this_state < other.this_state
\ No newline at end of file
@@ -8,29 +8,66 @@ def roomba_manhattan_onegoal(state : RoombaState) -> float:
     """A heuristic for RoombaState assuming there is only one goal tile.
     Return the manhattan distance to that dirty tile.
     """
-    for r in range(state.get_height()):
-        for c in range(state.get_width()):
-            if state.get_terrain(Coordinate(r,c)) in (DIRTY_CARPET, DIRTY_FLOOR) : 
-                # Return manhattan distance between roomba and goal positions
-                
-                return abs(r - state.position.row) + abs(c - state.position.col)
-
-    return 0 # in the case of no goal, we will return a meaningless value
+    dirty_coords = state.problem.dirty_coords
+    if not dirty_coords:
+        return 0 # in the case of no goal, we will return a meaningless value
+    # Return manhattan distance between roomba and goal positions
+    goal = dirty_coords[0]
+    return abs(goal.row - state.position.row) + abs(goal.col - state.position.col)
 
 
 def roomba_manhattan_multigoal(state : RoombaState) -> float:
     """ A heuristic for RoombaState if there is more than one goal tile. 
     Return the manhattan distance to the closest goal.
+    The dirty tiles are looked up in the RoombaProblem's index of them, rather than by scanning the grid.
+    """
+    position = state.position
+    row, col = position.row, position.col
+    # look for smallest manhattan distance between roomba and goal positions
+    return min((abs(goal.row - row) + abs(goal.col - col) for goal in state.problem.dirty_coords), default = INF)
+
+
+def roomba_true_distance(state : RoombaState) -> float:
+    """ A perfect heuristic for RoombaState: the true cost of the cheapest path to the closest dirty spot,
+    taking walls and carpet into account. It is looked up in the goal distances that the RoombaProblem
+    finds with one backwards uniform cost search from all the dirty spots (see RoombaProblem.get_goal_distances).
+    """
+    return state.problem.get_goal_distances()[state.cell]
+
+def roomba_true_distance_precompute(state : RoombaState):
+    """ Find the goal distances ahead of the search, so that the time it takes can be measured separately. """
+    state.problem.get_goal_distances()
+
+roomba_true_distance.precompute = roomba_true_distance_precompute # type: ignore
+
+
+#### Backward heuristics #################################################
+
+"""
+For searching backward toward the initial state (see search_heuristics.get_backward_heuristic),
+each heuristic estimates the cost from the initial state in the same way it estimates the cost to the goal.
+"""
+
+def roomba_manhattan_backward(initial_state : RoombaState) -> Callable[[RoombaState], float]:
+    """ Returns the heuristic of the manhattan distance from the initial state's position. """
+    start = initial_state.position
+    def roomba_manhattan_from_start(state : RoombaState) -> float:
+        position = state.position
+        return abs(start.row - position.row) + abs(start.col - position.col)
+    return roomba_manhattan_from_start
+
+def roomba_true_distance_backward(initial_state : RoombaState) -> Callable[[RoombaState], float]:
+    """ Returns the heuristic of the true cost of the cheapest path from the initial state,
+    looked up in the distances that the RoombaProblem finds from its cell (see RoombaProblem.get_start_distances).
     """
-    min_dist = INF
+    distances = initial_state.problem.get_start_distances(initial_state.cell)
+    def roomba_true_distance_from_start(state : RoombaState) -> float:
+        return distances[state.cell]
+    return roomba_true_distance_from_start
 
-    for r in range(state.get_height()):
-        for c in range(state.get_width()):
-            if state.get_terrain(Coordinate(r,c)) in (DIRTY_CARPET, DIRTY_FLOOR) : 
-                # look for smallest manhattan distance between roomba and goal positions
-                dist = abs(r - state.position.row) + abs(c - state.position.col)
-                min_dist = min(min_dist, dist)
-    return min_dist
+roomba_manhattan_onegoal.backward = roomba_manhattan_backward # type: ignore
+roomba_manhattan_multigoal.backward = roomba_manhattan_backward # type: ignore
+roomba_true_distance.backward = roomba_true_distance_backward # type: ignore
 
 
 # This is a named list of heuristics for the Roomba problem.
@@ -39,6 +76,7 @@ ROOMBA_HEURISTICS = {
     "Zero" : zero_heuristic, 
     "Arbitrary": arbitrary_heuristic, 
     "Manhattan Dist. (one goal)" : roomba_manhattan_onegoal,
-    "Manhattan Dist. (closest)" : roomba_manhattan_multigoal
+    "Manhattan Dist. (closest)" : roomba_manhattan_multigoal,
+    "True Distance" : roomba_true_distance
     }
 
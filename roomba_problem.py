@@ -1,5 +1,7 @@
 from __future__ import annotations
 from typing import Optional, Tuple, Dict, Any, Hashable, Iterable, NewType
+from array import array
+from heapq import heappush, heappop
 
 from search_problem import StateNode, Action
 
@@ -15,11 +17,14 @@ DIRTY_CARPET = Terrain('+')
 """The cost to move onto different types of terrain."""
 TRANSITION_COSTS : Dict[Terrain, float]= {FLOOR: 1, CARPET: 2, WALL: 0, DIRTY_FLOOR: 1, DIRTY_CARPET: 2}
 
+INF = float('inf')
+
 class Coordinate:
     """ Represents a specific location on the grid with row r and column c
     Can be created with Coordinate(r=row, c=col), or just Coordinate(r,c).
     Properties row and col can be accessed via dot notation.
     """
+    __slots__ = ("row", "col")
     row : int
     col : int
     def __init__(self, row : int, col : int):
@@ -46,6 +51,7 @@ class RoombaAction(Coordinate, Action):
     A RoombaAction is an Action and a Coordinate, representing the *relative* coordinate a Roomba is trying to move - that is, the 
     number of rows down and columns right the roomba is trying to move. 
     """
+    __slots__ = ()
 
     def __str__(self):
         return ACTION_NAMES[self]
@@ -61,10 +67,186 @@ class RoombaAction(Coordinate, Action):
 # Global constants related to RoombaAction
 ALL_ACTIONS : Tuple[RoombaAction, ...] = (RoombaAction(0,1), RoombaAction(1,0), RoombaAction(0, -1), RoombaAction(-1,0))
 ACTION_NAMES : Dict[RoombaAction, str] = {RoombaAction(0,1): "East", RoombaAction(1,0): "South", RoombaAction(0, -1): "West", RoombaAction(-1,0): "North"}
+# The action that undoes each of ALL_ACTIONS, in the same order
+OPPOSITE_ACTIONS : Tuple[RoombaAction, ...] = (ALL_ACTIONS[2], ALL_ACTIONS[3], ALL_ACTIONS[0], ALL_ACTIONS[1])
+# The terrain bytes (see RoombaProblem.terrain) of dirty spots
+DIRTY_CODES : Tuple[int, ...] = (ord(DIRTY_FLOOR), ord(DIRTY_CARPET))
+# Marks the jump points (see RoombaProblem.get_jump_point) that haven't been looked for yet
+UNKNOWN_JUMP_POINT = -2
 
 
 """All the directions the roomba position can move, and their names."""
 
+class RoombaProblem:
+    """
+    The data of a Roomba Route environment that is the same for every state: the grid of terrain.
+    All the RoombaStates of an environment share a single RoombaProblem, rather than each holding the data.
+
+    Cells are numbered in row-major order (cell = row * width + col), and tables indexed by cell are built once here,
+    so that generating moves is just a table read:
+    terrain -- a flat bytearray of each cell's terrain character
+    coords -- a shared Coordinate for each cell
+    costs -- the cost to move onto each cell
+    moves -- the legal (action, next cell) pairs from each cell
+    neighbors -- the next cell in each direction of ALL_ACTIONS from each cell, or -1 where that move is not legal
+    previous_moves -- the (action, previous cell) pairs that lead to each cell (from its neighbors)
+    dirty_cells -- the cells of all the dirty spots, in order
+    dirty_coords -- the (shared) Coordinates of all the dirty spots, in the same order
+    goal_distances -- the cost of the cheapest path from each cell to a dirty spot, made when first needed
+    start_distances -- the cost of the cheapest path from a start cell to each cell, for each start cell they were needed for
+    """
+    __slots__ = ("grid", "height", "width", "terrain", "coords", "costs", "moves", "neighbors", "previous_moves", "dirty_cells", "dirty_coords",
+                 "goal_distances", "start_distances", "jump_points")
+    grid : Tuple[Tuple[Terrain,...],...]
+    height : int
+    width : int
+    terrain : bytearray
+    coords : Tuple[Coordinate, ...]
+    costs : Tuple[float, ...]
+    moves : Tuple[Tuple[Tuple[RoombaAction, int], ...], ...]
+    neighbors : Tuple[Tuple[int, ...], ...]
+    previous_moves : Tuple[Tuple[Tuple[RoombaAction, int], ...], ...]
+    dirty_cells : Tuple[int, ...]
+    dirty_coords : Tuple[Coordinate, ...]
+    goal_distances : Optional[array]
+    start_distances : Dict[int, array]
+    jump_points : array
+
+    def __init__(self, grid : Tuple[Tuple[Terrain,...],...]):
+        """
+        Keyword Arguments:
+        grid: 2-d Tuple grid of Terrains, representing the maze.
+        """
+        self.grid = grid
+        self.height = len(grid)
+        self.width = len(grid[0])
+        h, w = self.height, self.width
+        self.terrain = bytearray(ord(x) for row in grid for x in row)
+        self.coords = tuple(Coordinate(r, c) for r in range(h) for c in range(w))
+        self.costs = tuple(TRANSITION_COSTS[Terrain(x)] for row in grid for x in row)
+        wall = ord(WALL)
+        moves = []
+        neighbors = []
+        previous_moves = []
+        for r in range(h):
+            for c in range(w):
+                cell_moves = []
+                cell_neighbors = []
+                cell_previous_moves = []
+                # Like is_valid_position, only the cell moved onto has to be in bounds and not a wall
+                # (so a roomba that starts in a wall can still move out of it, but not back in).
+                # Previous moves are exactly the reverse: any neighbor, even a wall, can move onto a cell that isn't a wall.
+                for action, opposite in zip(ALL_ACTIONS, OPPOSITE_ACTIONS):
+                    nr, nc = r + action.row, c + action.col
+                    if 0 <= nr < h and 0 <= nc < w:
+                        if self.terrain[nr * w + nc] != wall:
+                            cell_moves.append((action, nr * w + nc))
+                            cell_neighbors.append(nr * w + nc)
+                        else:
+                            cell_neighbors.append(-1)
+                        if self.terrain[r * w + c] != wall:
+                            cell_previous_moves.append((opposite, nr * w + nc))
+                    else:
+                        cell_neighbors.append(-1)
+                moves.append(tuple(cell_moves))
+                neighbors.append(tuple(cell_neighbors))
+                previous_moves.append(tuple(cell_previous_moves))
+        self.moves = tuple(moves)
+        self.neighbors = tuple(neighbors)
+        self.previous_moves = tuple(previous_moves)
+        self.dirty_cells = tuple(cell for cell, terrain in enumerate(self.terrain) if terrain in DIRTY_CODES)
+        self.dirty_coords = tuple(self.coords[cell] for cell in self.dirty_cells)
+        self.goal_distances = None
+        self.start_distances = {}
+        self.jump_points = array('i', [UNKNOWN_JUMP_POINT]) * (len(ALL_ACTIONS) * len(self.terrain))
+
+    def get_cell(self, coord : Coordinate) -> int:
+        """ The cell index of a Coordinate. """
+        return coord.row * self.width + coord.col
+
+    def get_goal_distances(self) -> array:
+        """ Returns the goal distances: the cost of the cheapest path from each cell to any dirty spot (inf if there is none).
+        They are found by one uniform cost search (Dijkstra's algorithm) backwards from all the dirty spots at once,
+        the first time they are needed.
+        """
+        if self.goal_distances is None:
+            distances = array('d', [INF]) * len(self.terrain)
+            frontier = []
+            for cell in self.dirty_cells:
+                distances[cell] = 0
+                frontier.append((0, cell))
+            costs, previous_moves = self.costs, self.previous_moves
+            while frontier:
+                distance, cell = heappop(frontier)
+                if distance > distances[cell]:
+                    continue
+                distance += costs[cell]
+                for _, previous_cell in previous_moves[cell]:
+                    if distance < distances[previous_cell]:
+                        distances[previous_cell] = distance
+                        heappush(frontier, (distance, previous_cell))
+            self.goal_distances = distances
+        return self.goal_distances
+
+    def get_start_distances(self, start_cell : int) -> array:
+        """ Returns the cost of the cheapest path from the start cell to each cell (inf if there is none).
+        They are found by one uniform cost search (Dijkstra's algorithm) forwards from the start cell,
+        the first time they are needed for that start cell.
+        """
+        if start_cell not in self.start_distances:
+            distances = array('d', [INF]) * len(self.terrain)
+            distances[start_cell] = 0
+            frontier = [(0.0, start_cell)]
+            costs, moves = self.costs, self.moves
+            while frontier:
+                distance, cell = heappop(frontier)
+                if distance > distances[cell]:
+                    continue
+                for _, next_cell in moves[cell]:
+                    next_distance = distance + costs[next_cell]
+                    if next_distance < distances[next_cell]:
+                        distances[next_cell] = next_distance
+                        heappush(frontier, (next_distance, next_cell))
+            self.start_distances[start_cell] = distances
+        return self.start_distances[start_cell]
+
+    def get_jump_point(self, cell : int, direction : int) -> int:
+        """ Returns the cell of the jump point reached by moving from the cell in the direction (an index into ALL_ACTIONS)
+        as far as possible, or -1 if there is none before a wall. Since the grid never changes, each is only found once.
+
+        Moving East or West, a cell is a jump point if it is dirty, or if one of its North/South neighbors is "forced":
+        one that can't be reached as cheaply by moving North/South first, since the cell beside the previous cell
+        (in that direction) is a wall or costs more than this one. A path that doesn't turn there can always
+        make its North/South moves earlier for no extra cost, so optimal paths only need to turn at jump points.
+        Moving North or South, turning East or West is always allowed, so a cell is a jump point if it is dirty,
+        or if moving East or West from it reaches a jump point.
+        """
+        key = cell * len(ALL_ACTIONS) + direction
+        jump_point = self.jump_points[key]
+        if jump_point != UNKNOWN_JUMP_POINT:
+            return jump_point
+        neighbors, terrain, costs = self.neighbors, self.terrain, self.costs
+        jump_point = -1
+        start = cell
+        next_cell = neighbors[cell][direction]
+        while next_cell >= 0:
+            if terrain[next_cell] in DIRTY_CODES:
+                jump_point = next_cell
+            elif direction % 2 == 0: # East or West
+                for side in (1, 3): # South and North
+                    if neighbors[next_cell][side] >= 0:
+                        beside = neighbors[cell][side]
+                        if beside < 0 or costs[beside] > costs[next_cell]:
+                            jump_point = next_cell
+            elif self.get_jump_point(next_cell, 0) >= 0 or self.get_jump_point(next_cell, 2) >= 0:
+                jump_point = next_cell
+            if jump_point >= 0:
+                break
+            cell, next_cell = next_cell, neighbors[next_cell][direction]
+        self.jump_points[key] = jump_point
+        return jump_point
+
+
 class RoombaState(StateNode):
     """
     An immutable representation of the state of a Roomba Route environment. 
@@ -73,8 +255,9 @@ class RoombaState(StateNode):
     """
 
     """ Type Hints allow for the optional type declaration of "instance variables" this way, like Java """
-    position : Coordinate
-    grid : Tuple[Tuple[Terrain,...],...]
+    __slots__ = ("cell", "problem")
+    cell : int # The index of the roomba's cell (see RoombaProblem)
+    problem : RoombaProblem
     # These are already mentioned in the StateNode superclass, but more specifically typed here
     parent : Optional[RoombaState] 
     last_action : Optional[RoombaAction]
@@ -93,8 +276,9 @@ class RoombaState(StateNode):
             # Sanity check - is the grid really the right size?
             assert (len(grid) == max_r and all( len(row) == max_c for row in grid))
 
-            return RoombaState(position = Coordinate(init_r, init_c),
-                                grid = grid,
+            problem = RoombaProblem(grid)
+            return RoombaState(cell = problem.get_cell(Coordinate(init_r, init_c)),
+                                problem = problem,
                                 parent = None,
                                 last_action = None,
                                 depth = 0,
@@ -102,8 +286,8 @@ class RoombaState(StateNode):
     
     #Override
     def __init__(self , 
-                position: Coordinate, 
-                grid: Tuple[Tuple[Terrain,...],...], 
+                cell: int, 
+                problem: RoombaProblem, 
                 parent : Optional[RoombaState], 
                 last_action: Optional[RoombaAction],  #Note that actions are (relative) Coordinates!
                 depth : int, 
@@ -112,29 +296,39 @@ class RoombaState(StateNode):
         Creates a RoombaState, which represents a state of the roomba's environment .
 
         Keyword Arguments (in addition to StateNode arguments):
-        position: Coordinate of roomba agent's current row/col.
-        grid: 2-d Tuple grid of Terrains, representing the maze.
+        cell: index of the roomba agent's current cell (row * width + col).
+        problem: the RoombaProblem (with the grid of Terrains, representing the maze) shared by all states.
         """
         super().__init__(parent = parent, last_action = last_action, depth = depth, path_cost = path_cost)
-        self.position = position
-        self.grid = grid
+        self.cell = cell
+        self.problem = problem
 
 
     """ Additional accessor methods """
+
+    @property
+    def position(self) -> Coordinate:
+        """The Coordinate of roomba agent's current row/col (shared, from the RoombaProblem)"""
+        return self.problem.coords[self.cell]
+
+    @property
+    def grid(self) -> Tuple[Tuple[Terrain,...],...]:
+        """The 2-d Tuple grid of Terrains, representing the maze (kept in the shared RoombaProblem)"""
+        return self.problem.grid
     
     def get_width(self) -> int:
         """Returns the width (number of cols) of the maze"""
-        return len(self.grid[0])
+        return self.problem.width
 
     def get_height(self) -> int:
         """Returns the height (number of rows) of the maze"""
-        return len(self.grid)
+        return self.problem.height
 
     def is_inbounds(self, coord : Coordinate) -> bool:
-        return (coord.row >= 0) and (coord.col  >= 0) and (coord.row < self.get_height()) and (coord.col < self.get_width())
+        return (coord.row >= 0) and (coord.col  >= 0) and (coord.row < self.problem.height) and (coord.col < self.problem.width)
     
     def get_terrain(self, coord : Coordinate) -> Terrain:
-        return self.grid[coord.row][coord.col]
+        return self.problem.grid[coord.row][coord.col]
 
     def is_valid_position(self, coord: Coordinate) -> bool:
         return self.is_inbounds(coord) and self.get_terrain(coord) != WALL  
@@ -145,13 +339,13 @@ class RoombaState(StateNode):
     def get_state_features(self) -> Hashable:
         """Returns a full feature representation of the state.
         Since the grid is the same for all possible states in this environment
-        the position alone is sufficient to distinguish between states.
+        the position (cell index) alone is sufficient to distinguish between states.
 
         If two RoombaState objects represent the same state, get_features() should return the same for both objects.
         However, two RoombaState with identical state features may not represent the same node of the search tree -
         that is, they may have different parents, last actions, path lengths/costs etc...
                 """
-        return self.position
+        return self.cell
 
     # Override
     def __str__(self) -> str:
@@ -164,7 +358,7 @@ class RoombaState(StateNode):
     # Override
     def is_goal_state(self) -> bool:
         """Returns if a goal (terminal) state."""
-        return self.get_terrain(self.position) in (DIRTY_FLOOR, DIRTY_CARPET)
+        return self.problem.terrain[self.cell] in DIRTY_CODES
 
     # Override
     def is_legal_action(self, action : RoombaAction) -> bool:
@@ -173,10 +367,11 @@ class RoombaState(StateNode):
 
     # Override
     def get_all_actions(self) -> Iterable[RoombaAction]:
-        """Return all legal actions from this state. Actions are (relative) Coordinates."""
-        for action in ALL_ACTIONS:
-            if self.is_valid_position(action.applyTo(self.position)):
-                yield action
+        """Return all legal actions from this state. Actions are (relative) Coordinates.
+        They are read from the RoombaProblem's precomputed table of moves.
+        """
+        for action, _ in self.problem.moves[self.cell]:
+            yield action
         ### The above generator definition is equivalent to:
         # return (a for a in ALL_ACTIONS if self.is_legal_action(a))
         ### If it is better to get a List for the reusability, methods, or indexing:
@@ -189,11 +384,53 @@ class RoombaState(StateNode):
 
         -- action is assumed legal (is_legal_action called before)
         """
-        new_pos = action.applyTo(self.position)
-        step_cost = TRANSITION_COSTS[self.get_terrain(new_pos)]
-        return RoombaState( position = new_pos,
-                                grid = self.grid, # The grid doesn't change from state to state
+        problem = self.problem # The grid doesn't change from state to state
+        new_cell = self.cell + action.row * problem.width + action.col
+        return RoombaState( cell = new_cell,
+                                problem = problem,
+                                last_action = action,
+                                parent = self,
+                                depth = self.depth + 1,
+                                path_cost = self.path_cost + problem.costs[new_cell])
+    # Override
+    def get_goal_states(self) -> Iterable[RoombaState]:
+        """Returns a state at each dirty spot."""
+        for cell in self.problem.dirty_cells:
+            yield RoombaState(cell = cell,
+                                problem = self.problem,
+                                parent = None,
+                                last_action = None,
+                                depth = 0,
+                                path_cost = 0)
+
+    # Override
+    def get_previous_states(self) -> Iterable[RoombaState]:
+        """Returns the states that lead to this one: the roomba at each valid position next to this one.
+        Moving here costs the same from any of them, since the cost depends on the terrain moved onto.
+        """
+        step_cost = self.problem.costs[self.cell]
+        for action, previous_cell in self.problem.previous_moves[self.cell]:
+            yield RoombaState( cell = previous_cell,
+                                problem = self.problem,
                                 last_action = action,
                                 parent = self,
                                 depth = self.depth + 1,
-                                path_cost = self.path_cost + step_cost)
\ No newline at end of file
+                                path_cost = self.path_cost + step_cost)
+
+    # Override
+    def get_jump_points(self) -> Iterable[RoombaState]:
+        """Returns the state at the jump point (see RoombaProblem.get_jump_point) in each direction,
+        except straight back the way this state was reached (which never helps, since every move costs something).
+        Every jump point is searched in all the other directions, no matter how it was reached,
+        so that it doesn't matter which path to it is found first.
+        """
+        problem = self.problem
+        back = -1 if self.last_action is None else OPPOSITE_ACTIONS.index(self.last_action)
+        for direction, action in enumerate(ALL_ACTIONS):
+            if direction != back:
+                jump_point = problem.get_jump_point(self.cell, direction)
+                if jump_point >= 0:
+                    state = self
+                    while state.cell != jump_point:
+                        state = state.get_next_state(action)
+                    yield state
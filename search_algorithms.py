@@ -3,11 +3,14 @@
 # Email(s): matwan@bergen.org
 
 from __future__ import annotations
-from typing import List, Collection, Tuple, Callable, Optional, Union, Set, Dict, Type, Iterable
+from typing import List, Collection, Tuple, Callable, Optional, Union, Set, Dict, Type, Iterable, Iterator, Deque, Hashable, cast
 import random
+import sys
 from collections import deque
+from itertools import count, chain
 import heapq
 from search_problem import StateNode, Action
+from search_heuristics import HeuristicCache, IncrementalHeuristic, supports_incremental, get_backward_heuristic
 
 INF = float('inf')
 
@@ -20,6 +23,7 @@ class GoalSearchAgent():
     frontier : Collection[StateNode] # All Collections are "truthy" - they are True if not empty, False if empty
     total_extends : int 
     total_enqueues : int
+    state_index : StateIndex # Integer IDs for the states seen during this agent's search
 
     """ __init__, enqueue, and dequeue be overridden by STRATEGY partial subclasses (i.e. RandomSearch, DFS, BFS, UCS, Greedy, and AStar)"""
 
@@ -30,6 +34,7 @@ class GoalSearchAgent():
         super().__init__()
         self.total_extends = 0
         self.total_enqueues = 0
+        self.state_index = StateIndex()
 
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
         """ Add the state to the frontier, unless some property (e.g. depth/path cost) exceeds the cutoff """
@@ -208,6 +213,264 @@ class BreadthFirstSearch(GoalSearchAgent):
 
 
 
+class StateIndex:
+    """ Interns the states seen during a search: each distinct state (as given by get_state_features())
+    gets a dense integer ID - 0, 1, 2, ... in the order the states are first seen.
+
+    Anything that needs to be looked up by state (like the extended filter, or the queued node of each state)
+    can then be a list or bytearray indexed by ID, instead of a set or dict that hashes and compares whole StateNodes.
+    Only the interning itself hashes the state features, once per lookup.
+    """
+    ids : Dict[Hashable, int]
+
+    def __init__(self):
+        self.ids = {}
+
+    def __len__(self) -> int:
+        """ The number of distinct states seen so far (and the next ID to be given out)."""
+        return len(self.ids)
+
+    def get_id(self, state : StateNode) -> int:
+        """ Return the ID of the state, giving it the next unused ID if it hasn't been seen before."""
+        ids = self.ids
+        features = state.get_cached_state_features()
+        state_id = ids.get(features)
+        if state_id is None:
+            state_id = ids[features] = len(ids)
+        return state_id
+
+
+class StateBitmap:
+    """ A set of states, stored as a bytearray with one flag per state ID (of a StateIndex).
+    Like a set, states can be added and checked for with the "in" keyword.
+
+    Checking for a state and then adding it (the usual extended filter pattern) only looks up its ID once.
+    """
+    index : StateIndex
+    flags : bytearray
+    last_state : Optional[StateNode]
+    last_id : int
+
+    def __init__(self, index : Optional[StateIndex] = None):
+        self.index = index if index is not None else StateIndex()
+        self.flags = bytearray()
+        self.last_state = None
+        self.last_id = -1
+
+    def get_id(self, state : StateNode) -> int:
+        """ The ID of the state, remembering it in case the same node is added right after it was checked for."""
+        if state is not self.last_state:
+            self.last_state = state
+            self.last_id = self.index.get_id(state)
+        return self.last_id
+
+    def __contains__(self, state : StateNode) -> bool:
+        state_id = self.get_id(state)
+        return state_id < len(self.flags) and self.flags[state_id] != 0
+
+    def add(self, state : StateNode):
+        state_id = self.get_id(state)
+        if state_id >= len(self.flags):
+            # Grow (at least doubling) so that adding n states costs O(n) overall
+            self.flags.extend(bytes(max(state_id + 1, 2 * len(self.flags)) - len(self.flags)))
+        self.flags[state_id] = 1
+
+
+def tie_break_none(state : StateNode) -> float:
+    """ Tie-break key that treats all states alike, leaving the order to insertion (FIFO or LIFO)."""
+    return 0
+
+def tie_break_deep(state : StateNode) -> float:
+    """ Tie-break key that prefers the state with the highest path cost.
+    For A*, that is the state with the lowest heuristic value among states with the same f value."""
+    return -state.path_cost
+
+"""Tie-break policies for priority queue frontiers, as (tie-break key function, FIFO?) pairs.
+Among states with equal priority values, the state with the lowest tie-break key is dequeued first;
+among those, the least recently added (if FIFO) or the most recently added (if not FIFO).
+The heuristic strategies (Greedy, A* and its variants) default to "deep", since among states with the same f value,
+the one with the lowest heuristic value is usually closest to the goal; the others default to "fifo".
+"""
+TIE_BREAKS : Dict[str, Tuple[Callable[[StateNode], float], bool]] = {
+    "fifo": (tie_break_none, True),
+    "lifo": (tie_break_none, False),
+    "deep": (tie_break_deep, False),
+}
+
+
+class PriorityQueueFrontier:
+    """ A priority queue frontier for the priority-based strategies (UCS, Greedy, A*, and the _PQ variants).
+    The lowest priority value is dequeued first; ties are broken by the tie-break policy (see TIE_BREAKS).
+
+    This basic version is a heap (using heapq) of (priority_value, tie_break_key, insertion_count, statenode) tuples.
+    Since the insertion counts are unique, heapq never needs to compare the states themselves (with StateNode.__lt__),
+    and the order of dequeues is reproducible.
+    """
+    heap : List[Tuple[float, float, int, StateNode]]
+    tie_break_key : Callable[[StateNode], float]
+    fifo : bool
+    counter : Iterator[int]
+
+    def __init__(self, tie_break : str = "fifo", state_index : Optional[StateIndex] = None):
+        """ state_index is the StateIndex of the search, for frontiers that need to look up states."""
+        self.heap = []
+        self.tie_break_key, self.fifo = TIE_BREAKS[tie_break]
+        self.counter = count(1) if self.fifo else count(-1, -1)
+
+    def __len__(self) -> int:
+        """ The number of states in the frontier. Makes the frontier "truthy" - False when empty, like Collections."""
+        return len(self.heap)
+
+    def push(self, priority : float, state : StateNode):
+        """ Add the state to the frontier with the given priority value. """
+        heapq.heappush(self.heap, (priority, self.tie_break_key(state), next(self.counter), state))
+
+    def pop(self) -> StateNode:
+        """ Remove and return the state with the lowest priority value. """
+        return heapq.heappop(self.heap)[3]
+
+
+class IndexedPriorityQueueFrontier(PriorityQueueFrontier):
+    """ A priority queue frontier that keeps at most one node per state (as given by get_state_features()).
+
+    Pushing a state that is already in the frontier with an equal or better priority is ignored.
+    Pushing it with a better priority replaces the queued node (a "decrease-key"): the old heap entry is
+    left in place, but it is skipped when it reaches the top of the heap.
+
+    The queued node of each state is kept in a list indexed by state ID (see StateIndex),
+    and heap entries carry the state ID, so popping doesn't need to look the state up again.
+    """
+    heap : List[Tuple[float, float, int, int, StateNode]] # type: ignore # (priority, tie-break key, insertion count, state ID, node)
+    index : StateIndex
+    queued : List[Optional[Tuple[float, StateNode]]]
+    size : int
+
+    def __init__(self, tie_break : str = "fifo", state_index : Optional[StateIndex] = None):
+        super().__init__(tie_break, state_index)
+        self.index = state_index if state_index is not None else StateIndex()
+        self.queued = [] # state ID -> (priority, node) of the node queued for that state, or None
+        self.size = 0
+
+    def __len__(self) -> int:
+        """ The number of states in the frontier, not counting outdated heap entries. """
+        return self.size
+
+    def push(self, priority : float, state : StateNode):
+        """ Add the state to the frontier with the given priority value,
+        unless the same state is already queued with an equal or better priority.
+        """
+        state_id = self.index.get_id(state)
+        if state_id >= len(self.queued):
+            self.queued.extend([None] * (max(state_id + 1, 2 * len(self.queued)) - len(self.queued)))
+        queued = self.queued[state_id]
+        if queued is None:
+            self.size += 1
+        elif queued[0] <= priority:
+            return
+        self.queued[state_id] = (priority, state)
+        heapq.heappush(self.heap, (priority, self.tie_break_key(state), next(self.counter), state_id, state))
+
+    def pop(self) -> StateNode:
+        """ Remove and return the state with the lowest priority value, skipping outdated entries. """
+        while True:
+            _, _, _, state_id, state = heapq.heappop(self.heap)
+            queued = self.queued[state_id]
+            if queued is not None and queued[1] is state:
+                self.queued[state_id] = None
+                self.size -= 1
+                return state
+
+    def min_priority(self) -> float:
+        """ The lowest priority value in the frontier (INF if empty), dropping outdated entries from the top of the heap. """
+        while self.heap:
+            queued = self.queued[self.heap[0][3]]
+            if queued is not None and queued[1] is self.heap[0][4]:
+                return self.heap[0][0]
+            heapq.heappop(self.heap)
+        return INF
+
+    def get_states(self) -> Iterable[StateNode]:
+        """ All the states in the frontier (in no particular order). """
+        return (queued[1] for queued in self.queued if queued is not None)
+
+
+def is_integral(value : float) -> bool:
+    """ Whether the value is a whole number (an int, or a finite float with no fractional part)."""
+    return type(value) is int or (isinstance(value, float) and value.is_integer())
+
+
+class BucketQueueFrontier(PriorityQueueFrontier):
+    """ A bucket queue frontier (like Dial's algorithm) for integral priority values,
+    such as path costs with integer step costs, or integer heuristic values.
+
+    States are kept in one bucket (a deque) per distinct (priority value, tie-break key) pair, so pushing and
+    popping a state costs O(1) deque operations, plus a heap operation on the (few) distinct pairs
+    whenever a bucket is created or emptied. States are never compared with each other.
+    Within a bucket, states are dequeued in FIFO or LIFO order, according to the tie-break policy.
+
+    The first time a non-integral priority value is pushed, the frontier moves all its states
+    into a regular heap and behaves like a PriorityQueueFrontier from then on.
+    """
+    buckets : Optional[Dict[Tuple[float, float], Deque[Tuple[int, StateNode]]]]
+    keys : List[Tuple[float, float]]
+    size : int
+
+    def __init__(self, tie_break : str = "fifo", state_index : Optional[StateIndex] = None):
+        super().__init__(tie_break, state_index)
+        self.buckets = {} # (priority value, tie-break key) -> bucket of (insertion count, state); None once fallen back to the heap
+        self.keys = [] # heap of the (priority value, tie-break key) pairs that have a non-empty bucket
+        self.size = 0
+
+    def __len__(self) -> int:
+        """ The number of states in the frontier. """
+        return self.size
+
+    def push(self, priority : float, state : StateNode):
+        """ Add the state to the frontier with the given priority value. """
+        self.size += 1
+        if self.buckets is not None:
+            if is_integral(priority):
+                key = (priority, self.tie_break_key(state))
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = self.buckets[key] = deque()
+                    heapq.heappush(self.keys, key)
+                bucket.append((next(self.counter), state))
+                return
+            self.fall_back_to_heap()
+        super().push(priority, state)
+
+    def pop(self) -> StateNode:
+        """ Remove and return a state with the lowest priority value. """
+        self.size -= 1
+        if self.buckets is None:
+            return super().pop()
+        key = self.keys[0]
+        bucket = self.buckets[key]
+        state = bucket.popleft()[1] if self.fifo else bucket.pop()[1]
+        if not bucket:
+            del self.buckets[key]
+            heapq.heappop(self.keys)
+        return state
+
+    def fall_back_to_heap(self):
+        """ Move every state from the buckets into the heap (keeping their order), and use only the heap from now on."""
+        assert self.buckets is not None
+        self.heap = [(priority, tie, n, state) for (priority, tie), bucket in self.buckets.items() for n, state in bucket]
+        heapq.heapify(self.heap)
+        self.buckets = None
+        self.keys = []
+
+
+"""The kinds of priority queues that priority-based strategies can use as their frontier.
+The default, "bucket", falls back to a heap by itself if any priority value is not integral."""
+PRIORITY_QUEUES : Dict[str, Type[PriorityQueueFrontier]] = {
+    "bucket": BucketQueueFrontier,
+    "heap": PriorityQueueFrontier,
+    "indexed": IndexedPriorityQueueFrontier,
+}
+
+
 class UniformCostSearch(GoalSearchAgent):
     """ Partial class representing the Uniform Cost Search strategy.
     To be subclassed (multiple inheritance) with a mixin that
@@ -220,26 +483,28 @@ class UniformCostSearch(GoalSearchAgent):
     tuples of (priority_value, statenode). heapq orders elements by the first element.
 
     Check out the documentation of heapq: https://docs.python.org/3/library/heapq.html
+    The heap is wrapped in a PriorityQueueFrontier; the kind of priority queue can be chosen by name (see PRIORITY_QUEUES),
+    as can the policy for breaking ties between states with the same priority (see TIE_BREAKS).
     """
-    frontier : List[Tuple[float, StateNode]]
+    frontier : PriorityQueueFrontier
     
-    def __init__(self,*args, **kwargs):
+    def __init__(self, *args, priority_queue : str = "bucket", tie_break : str = "fifo", **kwargs):
         """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
         Create an empty frontier queue.
         """
         super().__init__(*args, **kwargs)
-        self.frontier = []
+        self.frontier = PRIORITY_QUEUES[priority_queue](tie_break, self.state_index)
 
         
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
         """ Add the state to the frontier, unless path COST exceeds the cutoff """
         if state.path_cost < cutoff:
-            heapq.heappush(self.frontier, (state.path_cost, state))
+            self.frontier.push(state.path_cost, state)
 
         
     def dequeue(self) -> StateNode:
         """  Choose, remove, and return the state with LOWEST PATH COST from the frontier."""
-        return heapq.heappop(self.frontier)[1]
+        return self.frontier.pop()
 
 class GraphSearchAlgorithm(GoalSearchAgent):
     """
@@ -266,7 +531,7 @@ class GraphSearchAlgorithm(GoalSearchAgent):
         Create a set of extended states. Before extending any state, check if the state has already been extended.
         If so, skip it. Otherwise, extend and add to the set. 
         """
-        ext_filter : Set[StateNode] = set() # Create an empty extended state filter
+        ext_filter : StateBitmap = StateBitmap(self.state_index) # Create an empty extended state filter (a set would do too)
 
         #TODO implement! (You may start by copying your TreeSearch's code)
         self.enqueue(initial_state)
@@ -300,6 +565,48 @@ class GraphSearchAlgorithm(GoalSearchAgent):
 
 
 
+class JumpPointSearchAlgorithm(GoalSearchAgent):
+    """
+    Mixin class for jump point search: graph search that only extends the "jump points" of a grid environment
+    (see StateNode.get_jump_points), skipping over runs of states that all optimal paths can pass straight through.
+    On open, uniform cost grids, that is far fewer states than graph search extends.
+
+    Mixed in with UCS or A* (with a consistent heuristic), it still finds optimal paths.
+    Only works for environments that implement get_jump_points (like RoombaState).
+    """
+    def search(self, 
+            initial_state : StateNode, 
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF 
+            ) -> Optional[StateNode]:
+        """ Perform a graph search from the initial_state, but enqueue the jump points of each extended state
+        instead of its neighbors.
+        """
+        ext_filter : StateBitmap = StateBitmap(self.state_index)
+
+        self.enqueue(initial_state)
+        while self.frontier: 
+            ext_node = self.dequeue()       
+
+            if ext_node in ext_filter:
+                continue
+            ext_filter.add(ext_node)
+
+            if ext_node.is_goal_state():
+                return ext_node 
+
+            if(gui_callback_fn(ext_node)):
+                break
+            
+            self.total_extends += 1
+
+            for jump_point in ext_node.get_jump_points():
+                self.enqueue(jump_point, cutoff)
+                self.total_enqueues += 1
+
+        return None 
+
+
 #### Lab 1, Part 2b: Informed Search #################################################
 
 class InformedSearchAgent(GoalSearchAgent):
@@ -310,14 +617,19 @@ class InformedSearchAgent(GoalSearchAgent):
     """
     heuristic : Callable[[StateNode],float]
 
-    def __init__(self, heuristic : Callable[[StateNode],float], *args, **kwargs):
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, heuristic_cache : float = 0, **kwargs):
         """ To be overridden by subclasses (RandomWalk, RandomSearch, DFS, BFS, UCS, Greedy, and AStar)
         Create an empty frontier queue, 
         and initialize self.total_extends and self.total_enqueues to 0s. 
         Will be called by GUI before any search.
+
+        Heuristics that support incremental evaluation are wrapped in an IncrementalHeuristic, so they are O(1) per node.
+        If heuristic_cache is not 0, the heuristic is wrapped in a HeuristicCache holding that many values (INF for unlimited).
         """
         super().__init__(heuristic = heuristic, *args, **kwargs) # pass any unused parameters to any superclasses
-        self.heuristic = heuristic
+        if supports_incremental(heuristic):
+            heuristic = IncrementalHeuristic(heuristic)
+        self.heuristic = HeuristicCache(heuristic, heuristic_cache) if heuristic_cache else heuristic
     
 
 class GreedyBestSearch(InformedSearchAgent):
@@ -327,27 +639,27 @@ class GreedyBestSearch(InformedSearchAgent):
 
     Greedy Best is implemented with a priority queue. 
     """
-    frontier : List[Tuple[float, StateNode]]
+    frontier : PriorityQueueFrontier
 
-    def __init__(self, heuristic : Callable[[StateNode],float]):
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, priority_queue : str = "bucket", tie_break : str = "deep", **kwargs):
         """ Initialize self.total_extends and self.total_enqueues(done in super().__init__())
         Create an empty frontier queue.
         Also takes the heuristic function to be used as an estimate
         of the remaining cost to goal. 
         """
-        super().__init__(heuristic)
-        self.frontier = []
+        super().__init__(heuristic, *args, **kwargs)
+        self.frontier = PRIORITY_QUEUES[priority_queue](tie_break, self.state_index)
 
         
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
         """ Add the state to the frontier, unless path COST exceeds the cutoff """
         if state.path_cost < cutoff:
-            heapq.heappush(self.frontier, (self.heuristic(state), state))
+            self.frontier.push(self.heuristic(state), state)
 
         
     def dequeue(self) -> StateNode:
         """  Choose and remove the state with LOWEST ESTIMATED REMAINING COST TO GOAL from the frontier."""
-        return heapq.heappop(self.frontier)[1]
+        return self.frontier.pop()
 
 
 class AStarSearch(InformedSearchAgent):
@@ -357,27 +669,49 @@ class AStarSearch(InformedSearchAgent):
 
     A* is implemented with a priority queue. 
     """
-    frontier : List[Tuple[float, StateNode]]
+    frontier : PriorityQueueFrontier
 
-    def __init__(self, heuristic : Callable[[StateNode],float], *args, **kwargs):
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, priority_queue : str = "bucket", tie_break : str = "deep", **kwargs):
         """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
         Create an empty frontier queue.
         Also takes the heuristic function to be used as an estimate
         of remaining path cost. 
         """
         super().__init__(heuristic, *args, **kwargs)
-        self.frontier = []
+        self.frontier = PRIORITY_QUEUES[priority_queue](tie_break, self.state_index)
 
         
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
         """ Add the state to the frontier, unless path COST exceeds the cutoff """
         if state.path_cost < cutoff:
-            heapq.heappush(self.frontier, (state.path_cost + self.heuristic(state), state))
+            self.frontier.push(state.path_cost + self.heuristic(state), state)
 
         
     def dequeue(self) -> StateNode:
         """  Choose, remove, and return the state with LOWEST ESTIMATED TOTAL PATH COST from the frontier."""
-        return heapq.heappop(self.frontier)[1]
+        return self.frontier.pop()
+
+
+class WeightedAStarSearch(AStarSearch):
+    """ Partial class representing a search strategy.
+    To be subclassed (multiple inheritance) with a mixin that
+    that implements a search algorithm (i.e. TreeSearchAgent or GraphSearchAgent)
+
+    Weighted A* is A* with the heuristic multiplied by a weight w >= 1 (f = g + w * h), which makes it greedier:
+    it usually finds a solution after far fewer extends, and (with an admissible heuristic) the solution's cost is at most
+    w times the optimal cost. With w = 1, it is just A*.
+    """
+    weight : float
+
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, weight : float = 2.0, **kwargs):
+        """ Like A*, plus the weight w of the heuristic."""
+        super().__init__(heuristic, *args, **kwargs)
+        self.weight = weight
+
+    def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
+        """ Add the state to the frontier, unless path COST exceeds the cutoff """
+        if state.path_cost < cutoff:
+            self.frontier.push(state.path_cost + self.weight * self.heuristic(state), state)
 
 
 """ Informed search algorithms can be reconfigured to provide a "closest" answer
@@ -414,7 +748,7 @@ class AnytimeSearchAlgorithm(InformedSearchAgent):
         """
         # Keep track of the closest path found yet
         anytime_result  : Tuple[Optional[StateNode], float, float] = (None, INF, INF) 
-        ext_filter : Set[StateNode] = set() 
+        ext_filter : StateBitmap = StateBitmap(self.state_index) 
         self.enqueue(initial_state)
         while self.frontier: 
             ext_node = self.dequeue()       
@@ -451,17 +785,16 @@ EXTRA_STUFF = True
 
 class DepthFirstSearch_PQ(GoalSearchAgent):
     """ DFS implemented with a Priority Queue. 
-    This implementation will tie-break based on natural ordering of states, as defined in the 
-    __lt__() function.
+    Ties are broken by the frontier's tie-break policy (see TIE_BREAKS), not by comparing states.
     """   
-    frontier : List[Tuple[float, StateNode]]
+    frontier : PriorityQueueFrontier
     
-    def __init__(self,*args, **kwargs):
+    def __init__(self, *args, priority_queue : str = "bucket", tie_break : str = "fifo", **kwargs):
         """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
         Create an empty frontier queue.
         """
         super().__init__(*args, **kwargs)
-        self.frontier = []
+        self.frontier = PRIORITY_QUEUES[priority_queue](tie_break, self.state_index)
 
         
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
@@ -469,26 +802,25 @@ class DepthFirstSearch_PQ(GoalSearchAgent):
         The priority is negatve depth, so the deepest node has priority.
         """
         if state.depth < cutoff:
-            heapq.heappush(self.frontier, (-state.depth, state))
+            self.frontier.push(-state.depth, state)
 
         
     def dequeue(self) -> StateNode:
         """  Choose, remove, and return the state with  so the DEEPEST node is dequeued from the frontier."""
-        return heapq.heappop(self.frontier)[1]
+        return self.frontier.pop()
 
 class BreadthFirstSearch_PQ(GoalSearchAgent):
     """ BFS implemented with a Priority Queue. 
-    This implementation will tie-break based on natural ordering of states, as defined in the 
-    __lt__() function.
+    Ties are broken by the frontier's tie-break policy (see TIE_BREAKS), not by comparing states.
     """   
-    frontier : List[Tuple[float, StateNode]]
+    frontier : PriorityQueueFrontier
     
-    def __init__(self,*args, **kwargs):
+    def __init__(self, *args, priority_queue : str = "bucket", tie_break : str = "fifo", **kwargs):
         """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
         Create an empty frontier queue.
         """
         super().__init__(*args, **kwargs)
-        self.frontier = []
+        self.frontier = PRIORITY_QUEUES[priority_queue](tie_break, self.state_index)
 
         
     def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
@@ -496,12 +828,12 @@ class BreadthFirstSearch_PQ(GoalSearchAgent):
         The priority is depth, so the shallowest node has priority.
         """
         if state.depth < cutoff:
-            heapq.heappush(self.frontier, (state.depth, state))
+            self.frontier.push(state.depth, state)
 
         
     def dequeue(self) -> StateNode:
         """  Choose, remove, and return the state with  so the SHALLOWEST node is dequeued from the frontier."""
-        return heapq.heappop(self.frontier)[1]
+        return self.frontier.pop()
 
 
 
@@ -554,8 +886,712 @@ class TreeSearchNoTailBiteAlgorithm(GoalSearchAgent):
         return None # if frontier ever empties without finding the goal, search has failed
 
 
+""" The following agents implement both a search algorithm and a strategy on their own,
+so they are not mixed with the STRATEGIES (see STANDALONE_AGENTS below).
+"""
+
+class IterativeDeepeningAStarSearch(InformedSearchAgent):
+    """
+    Iterative-Deepening A* (IDA*).
+
+    Repeats a depth-first tree search (without backtracking) that only extends states whose
+    f = path_cost + heuristic is within a bound. The first bound is the initial state's f, and each
+    following bound is the smallest f that went over the previous bound.
+    With an admissible heuristic, the first solution found is optimal.
+
+    Only the states along the current path and their not-yet-extended siblings are kept in the frontier,
+    so memory is linear in the solution depth - but states may be extended many times.
+    """
+    frontier : List[StateNode]
+
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, **kwargs):
+        """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
+        Create an empty frontier stack.
+        """
+        super().__init__(heuristic, *args, **kwargs)
+        self.frontier = []
+
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform an IDA* search from the initial_state.
+        States whose path cost exceeds the cutoff are never enqueued.
+        Returns None if there is no solution (within the cutoff), or if gui_callback_fn ended the search early.
+        """
+        bound = initial_state.path_cost + self.heuristic(initial_state)
+        while bound < INF:
+            next_bound = INF
+            self.frontier = [initial_state]
+            while self.frontier:
+                ext_node = self.dequeue()
+
+                # Don't extend past the bound, but remember the smallest f that went over it.
+                f = ext_node.path_cost + self.heuristic(ext_node)
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+
+                if ext_node.is_goal_state():
+                    return ext_node
+
+                if(gui_callback_fn(ext_node)):
+                    return None
+
+                self.total_extends += 1
+
+                for neighbor in generate_neighbor_states(ext_node):
+                    if neighbor != ext_node.parent: # This is the no-backtracking check
+                        self.enqueue(neighbor, cutoff)
+                        self.total_enqueues += 1
+            bound = next_bound
+
+        return None # Nothing went over the bound, so there's nothing left to search
+
+    def enqueue(self, state: StateNode, cutoff: Union[int, float] = INF):
+        """ Add the state to the frontier stack, unless path COST exceeds the cutoff """
+        if state.path_cost < cutoff:
+            self.frontier.append(state)
+
+    def dequeue(self) -> StateNode:
+        """  Remove and return the MOST RECENTLY ADDED state from the frontier stack."""
+        return self.frontier.pop()
+
+
+class RecursiveBestFirstSearch(InformedSearchAgent):
+    """
+    Recursive Best-First Search (RBFS).
+
+    Recursively extends the state with the lowest f = path_cost + heuristic among the current state's children,
+    but only as long as it stays within the f of the best alternative path elsewhere. When it goes over,
+    the recursion unwinds and the child's f is "backed up" to the lowest f found below it, so that the
+    search can come back to it later without starting over.
+    With an admissible heuristic, the first solution found is optimal.
 
-# Collection of all the above 
+    Only the states along the current path and their siblings are kept, so memory is linear in the solution depth.
+    (The recursion is as deep as the search path, which is limited by Python's recursion limit.)
+    """
+    stopped : bool
+
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, **kwargs):
+        """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())"""
+        super().__init__(heuristic, *args, **kwargs)
+        self.stopped = False
+
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform an RBFS search from the initial_state.
+        States whose path cost exceeds the cutoff are never extended.
+        Returns None if there is no solution (within the cutoff), or if gui_callback_fn ended the search early.
+        """
+        self.stopped = False
+        f = initial_state.path_cost + self.heuristic(initial_state)
+        return self.rbfs(initial_state, f, INF, gui_callback_fn, cutoff)[0]
+
+    def rbfs(self,
+            ext_node : StateNode,
+            f : float,
+            f_limit : float,
+            gui_callback_fn : Callable[[StateNode],bool],
+            cutoff : Union[int, float]
+            ) -> Tuple[Optional[StateNode], float]:
+        """ Search below ext_node (whose backed-up f value is given) without going over f_limit.
+        Returns the goal state found (or None), and the new backed-up f value of ext_node.
+        """
+        if ext_node.is_goal_state():
+            return ext_node, f
+
+        if(gui_callback_fn(ext_node)):
+            self.stopped = True
+            return None, INF
+
+        self.total_extends += 1
+
+        # Each child's f can be no lower than its parent's backed-up f.
+        children : List[Tuple[float, StateNode]] = []
+        for neighbor in generate_neighbor_states(ext_node):
+            if neighbor != ext_node.parent: # This is the no-backtracking check
+                if neighbor.path_cost < cutoff:
+                    children.append((max(neighbor.path_cost + self.heuristic(neighbor), f), neighbor))
+                self.total_enqueues += 1
+
+        if not children:
+            return None, INF
+
+        while True:
+            children.sort(key = lambda child: child[0])
+            best_f, best = children[0]
+            if best_f > f_limit:
+                return None, best_f
+            alternative_f = children[1][0] if len(children) > 1 else INF
+            result, best_f = self.rbfs(best, best_f, min(f_limit, alternative_f), gui_callback_fn, cutoff)
+            if result is not None or self.stopped:
+                return result, best_f
+            children[0] = (best_f, best)
+
+
+class MemoryBoundedNode:
+    """
+    SMA*'s bookkeeping for a StateNode that is kept in memory: its (backed-up) f value,
+    its children still in memory, and which of its children have been forgotten (pruned).
+    """
+    state : StateNode
+    parent : Optional[MemoryBoundedNode]
+    f : float
+    children : List[MemoryBoundedNode]
+    forgotten : Set[Hashable]
+    forgotten_f : float
+    extended : bool
+    in_memory : bool
+
+    def __init__(self, state : StateNode, parent : Optional[MemoryBoundedNode], f : float):
+        self.state = state
+        self.parent = parent
+        self.f = f
+        self.children = []
+        self.forgotten = set() # state features of the forgotten children
+        self.forgotten_f = INF # lowest f of the forgotten children
+        self.extended = False
+        self.in_memory = True
+
+    def get_open_priority(self) -> float:
+        """ The priority to (re-)extend this node with: its f if it has never been extended,
+        otherwise the lowest f among its forgotten children (INF if there are none to regenerate).
+        """
+        return self.forgotten_f if self.extended else self.f
+
+
+class SimplifiedMemoryBoundedAStarSearch(InformedSearchAgent):
+    """
+    Simplified Memory-Bounded A* (SMA*).
+
+    Works like A*, but never keeps more than max_nodes nodes in memory.
+    A child is dropped if a node for the same state with an equal or lower path cost (and depth) is already in memory
+    (so with enough memory, this is graph search, and it ends once every reachable state has been extended).
+    When memory is full, the leaf with the highest f (the shallowest, among ties) is forgotten, and its f is
+    backed up into its parent, which will regenerate it if that f ever becomes the best in the frontier again.
+    Each node's f is backed up to the lowest f among its children, so the search knows how good a
+    forgotten subtree was.
+
+    With an admissible heuristic, the solution is optimal if there is enough memory to hold the path to it
+    (and its siblings along the way), and otherwise the search fails. With max_nodes = INF (the default), nothing is
+    ever forgotten, so this is just graph search A* (preferring the deepest state among ties).
+
+    With a tight budget, the same subtrees may be forgotten and regenerated many times, which can take far longer than A*.
+
+    max_bytes is an alternative budget. It is converted to a number of nodes with a rough estimate
+    of the size of one node, made from the initial state.
+    """
+    frontier : List[Tuple[float, int, int, MemoryBoundedNode]]
+    leaves : List[Tuple[float, int, int, MemoryBoundedNode]]
+    max_nodes : float
+    max_bytes : float
+    nodes_in_memory : int
+    best_in_memory : Dict[Hashable, MemoryBoundedNode] # by state features, the node in memory with the lowest path cost
+    counter : count # tie-breaker for entries with equal priority
+
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, max_nodes : float = INF, max_bytes : float = INF, **kwargs):
+        """ Initialize self.total_extends and self.total_enqueues (done in super().__init__())
+        Create an empty frontier queue, and an empty queue of leaves to prune.
+        """
+        super().__init__(heuristic, *args, **kwargs)
+        self.max_nodes = max_nodes
+        self.max_bytes = max_bytes
+        self.frontier = []
+        self.leaves = []
+        self.nodes_in_memory = 0
+        self.best_in_memory = {}
+        self.counter = count()
+
+    @staticmethod
+    def estimate_node_bytes(state : StateNode) -> int:
+        """ A rough estimate of the memory used by one node (the StateNode and its bookkeeping),
+        not counting any data shared between states.
+        """
+        entry = MemoryBoundedNode(state, None, 0)
+        return (sys.getsizeof(state) + sys.getsizeof(state.get_state_features())
+                + sys.getsizeof(entry) + sys.getsizeof(entry.__dict__) + sys.getsizeof(entry.children) + sys.getsizeof(entry.forgotten))
+
+    def enqueue_entry(self, entry : MemoryBoundedNode):
+        """ Add the entry to the frontier, prioritizing the lowest open priority, then the deepest.
+        Outdated copies already in the frontier are skipped when they are dequeued.
+        """
+        heapq.heappush(self.frontier, (entry.get_open_priority(), -entry.state.depth, next(self.counter), entry))
+
+    def dequeue_entry(self) -> Optional[MemoryBoundedNode]:
+        """ Remove and return the entry with the lowest open priority (the deepest, among ties),
+        or None if nothing worth extending is left.
+        """
+        while self.frontier:
+            priority, _, _, entry = heapq.heappop(self.frontier)
+            if entry.in_memory and priority == entry.get_open_priority():
+                return entry if priority < INF else None
+        return None
+
+    def add_leaf(self, entry : MemoryBoundedNode):
+        """ Make the entry a candidate for pruning, prioritizing the highest f, then the shallowest."""
+        heapq.heappush(self.leaves, (-entry.f, entry.state.depth, next(self.counter), entry))
+
+    def prune(self, keep : Optional[MemoryBoundedNode] = None) -> bool:
+        """ Forget the worst leaf in memory, backing its f up into its parent.
+        The children of keep are only pruned if there is nothing else to prune.
+        Returns False if there was nothing to prune.
+        """
+        kept = []
+        pruned = False
+        while self.leaves:
+            record = heapq.heappop(self.leaves)
+            entry = record[3]
+            if not entry.in_memory or entry.children or entry.parent is None or -record[0] != entry.f:
+                continue # outdated (or the root, which is never pruned)
+            if entry.parent is keep and keep is not None:
+                kept.append(record)
+                continue
+            self.forget(entry)
+            pruned = True
+            break
+        if not pruned and kept:
+            self.forget(heapq.heappop(kept)[3])
+            pruned = True
+        for record in kept:
+            heapq.heappush(self.leaves, record)
+        return pruned
+
+    def compact(self):
+        """ Drop the outdated records from the frontier and leaf queues, so they don't keep forgotten nodes alive."""
+        self.frontier = [record for record in self.frontier
+                        if record[3].in_memory and record[0] == record[3].get_open_priority()]
+        heapq.heapify(self.frontier)
+        self.leaves = [record for record in self.leaves
+                        if record[3].in_memory and not record[3].children and -record[0] == record[3].f]
+        heapq.heapify(self.leaves)
+
+    def forget(self, entry : MemoryBoundedNode):
+        """ Remove the leaf entry from memory, backing its f up into its parent."""
+        parent = cast(MemoryBoundedNode, entry.parent)
+        features = entry.state.get_cached_state_features()
+        entry.in_memory = False
+        self.nodes_in_memory -= 1
+        if self.best_in_memory.get(features) is entry:
+            del self.best_in_memory[features]
+        parent.children.remove(entry)
+        parent.forgotten.add(features)
+        parent.forgotten_f = min(parent.forgotten_f, entry.f)
+        self.enqueue_entry(parent)
+        if not parent.children:
+            self.add_leaf(parent)
+
+    def back_up(self, entry : Optional[MemoryBoundedNode]):
+        """ Update the f values of the extended entry and its ancestors to the lowest f among their children."""
+        while entry is not None:
+            new_f = min([child.f for child in entry.children] + [entry.forgotten_f])
+            if new_f == entry.f:
+                break
+            entry.f = new_f
+            if not entry.children:
+                self.add_leaf(entry)
+            entry = entry.parent
+
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform an SMA* search from the initial_state.
+        States whose path cost exceeds the cutoff are never enqueued.
+        Returns None if there is no solution (within the cutoff and memory budget), or if gui_callback_fn ended the search early.
+        """
+        max_nodes = self.max_nodes
+        if self.max_bytes < INF:
+            max_nodes = min(max_nodes, self.max_bytes // self.estimate_node_bytes(initial_state))
+        # A path through a state any deeper than this could not fit in memory
+        max_depth = initial_state.depth + max_nodes - 1
+
+        self.frontier = []
+        self.leaves = []
+        root = MemoryBoundedNode(initial_state, None, initial_state.path_cost + self.heuristic(initial_state))
+        self.nodes_in_memory = 1
+        self.best_in_memory = {initial_state.get_cached_state_features(): root}
+        self.enqueue_entry(root)
+        self.add_leaf(root)
+
+        while True:
+            entry = self.dequeue_entry()
+            if entry is None:
+                return None
+            ext_node = entry.state
+
+            if ext_node.is_goal_state():
+                return ext_node
+
+            if(gui_callback_fn(ext_node)):
+                return None
+
+            self.total_extends += 1
+
+            # The first time, generate all children. After that, only regenerate forgotten ones.
+            regenerating = entry.extended
+            min_f = entry.forgotten_f if regenerating else entry.f
+            for neighbor in generate_neighbor_states(ext_node):
+                if neighbor != ext_node.parent: # This is the no-backtracking check
+                    features = neighbor.get_cached_state_features()
+                    if regenerating and features not in entry.forgotten:
+                        continue
+                    self.total_enqueues += 1
+                    if neighbor.path_cost >= cutoff:
+                        continue
+                    # Drop the child if a node in memory already reached its state at least as cheaply (and in as few steps)
+                    best = self.best_in_memory.get(features)
+                    if best is not None and best.state.path_cost <= neighbor.path_cost and best.state.depth <= neighbor.depth:
+                        continue
+                    if neighbor.depth >= max_depth and not neighbor.is_goal_state():
+                        f = INF
+                    else:
+                        f = max(neighbor.path_cost + self.heuristic(neighbor), min_f)
+                    child = MemoryBoundedNode(neighbor, entry, f)
+                    self.best_in_memory[features] = child
+                    entry.children.append(child)
+                    self.nodes_in_memory += 1
+                    self.enqueue_entry(child)
+                    self.add_leaf(child)
+            entry.extended = True
+            entry.forgotten.clear()
+            entry.forgotten_f = INF
+            self.back_up(entry)
+
+            while self.nodes_in_memory > max_nodes and self.prune(keep = entry):
+                pass
+            if len(self.frontier) + len(self.leaves) > 4 * self.nodes_in_memory + 64:
+                self.compact()
+
+
+class AnytimeRepairingAStarSearch(InformedSearchAgent):
+    """
+    Anytime Repairing A* (ARA*).
+
+    Starts with a weighted A* search (f = g + w * h) with a large weight w, which finds a solution quickly,
+    then repeatedly lowers w (by weight_step, down to 1) and searches again to improve the solution.
+    Rather than starting over, each search reuses the previous one: the cheapest path found to every state is kept,
+    the frontier is carried over (re-prioritized with the new w), and each state is extended at most once per search
+    (states whose path got cheaper after they were extended are set aside, and put back in the frontier for the next search).
+
+    After each search, the solution is reported to solution_callback (if given), along with a bound on how suboptimal it is:
+    its cost is at most bound times the optimal cost (with an admissible heuristic). The bound is 1 for the final solution.
+    If the search is ended early (by gui_callback_fn), the best solution found so far is returned, if any.
+    """
+    weight : float
+    weight_step : float
+    solution_callback : Optional[Callable[[StateNode, float], None]]
+    tie_break : str
+    solutions : List[Tuple[StateNode, float]] # Every (solution, bound) reported, in order
+
+    def __init__(self, heuristic : Callable[[StateNode],float], *args, weight : float = 2.0, weight_step : float = 0.5,
+            solution_callback : Optional[Callable[[StateNode, float], None]] = None, tie_break : str = "deep", **kwargs):
+        """ weight is the first search's w, and weight_step is how much it is lowered for each following search."""
+        super().__init__(heuristic, *args, **kwargs)
+        self.weight = weight
+        self.weight_step = weight_step
+        self.solution_callback = solution_callback
+        self.tie_break = tie_break
+        self.solutions = []
+
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform an ARA* search from the initial_state.
+        States whose path cost exceeds the cutoff are never enqueued.
+        Returns the best solution found, or None if there is none (within the cutoff) or the search was ended before finding one.
+        """
+        get_id = self.state_index.get_id
+        best : Dict[int, StateNode] = {get_id(initial_state) : initial_state} # The cheapest node found for each state
+        inconsistent : Dict[int, StateNode] = {} # Extended states whose path got cheaper since
+        solution : Optional[StateNode] = initial_state if initial_state.is_goal_state() else None
+        w = max(self.weight, 1.0)
+        frontier = IndexedPriorityQueueFrontier(self.tie_break, self.state_index)
+        frontier.push(initial_state.path_cost + w * self.heuristic(initial_state), initial_state)
+
+        while True:
+            # Search until the solution is no costlier than any f in the frontier
+            ext_filter = StateBitmap(self.state_index)
+            while frontier and (solution is None or solution.path_cost > frontier.min_priority()):
+                ext_node = frontier.pop()
+                ext_filter.add(ext_node)
+                if ext_node.is_goal_state():
+                    continue
+
+                if(gui_callback_fn(ext_node)):
+                    return solution
+
+                self.total_extends += 1
+
+                for neighbor in generate_neighbor_states(ext_node):
+                    if neighbor.path_cost >= cutoff:
+                        continue
+                    self.total_enqueues += 1
+                    neighbor_id = get_id(neighbor)
+                    previous = best.get(neighbor_id)
+                    if previous is not None and previous.path_cost <= neighbor.path_cost:
+                        continue
+                    best[neighbor_id] = neighbor
+                    if neighbor.is_goal_state() and (solution is None or neighbor.path_cost < solution.path_cost):
+                        solution = neighbor
+                    if neighbor in ext_filter:
+                        inconsistent[neighbor_id] = neighbor
+                    else:
+                        frontier.push(neighbor.path_cost + w * self.heuristic(neighbor), neighbor)
+
+            if solution is None:
+                return None
+
+            # No state left to extend could lead to a solution cheaper than this lowest f (with an admissible heuristic)
+            lowest_f = min((state.path_cost + self.heuristic(state) for state in chain(frontier.get_states(), inconsistent.values())),
+                            default = INF)
+            if solution.path_cost <= lowest_f:
+                bound = 1.0
+            else:
+                bound = min(w, solution.path_cost / lowest_f) if lowest_f > 0 else w
+            if not self.solutions or self.solutions[-1][0] is not solution or bound < self.solutions[-1][1]:
+                self.solutions.append((solution, bound))
+                if self.solution_callback is not None:
+                    self.solution_callback(solution, bound)
+            if bound <= 1:
+                return solution
+
+            # Lower w (at least to the bound, since searching with a higher w can't improve on it),
+            # and carry the frontier (plus the inconsistent states) over to the next search
+            w = max(min(w - self.weight_step, bound), 1.0)
+            states = list(chain(frontier.get_states(), inconsistent.values()))
+            inconsistent = {}
+            frontier = IndexedPriorityQueueFrontier(self.tie_break, self.state_index)
+            for state in states:
+                frontier.push(state.path_cost + w * self.heuristic(state), state)
+
+
+""" Bidirectional search: search forward from the initial state and backward from the goal states at the same time,
+until the two searches meet in the middle. If each search only has to go about half the depth d of the solution,
+they extend on the order of 2 * b^(d/2) states instead of b^d.
+
+Searching backward needs the environment to list its goal states and generate the states that lead to a state
+(see StateNode.get_goal_states and StateNode.get_previous_states).
+"""
+
+def join_paths(forward_node : StateNode, backward_node : StateNode) -> StateNode:
+    """ Join a node of the forward search with a node of the backward search for the same state.
+    Returns a node for the goal state at the end of the backward path, whose path goes through forward_node
+    (the backward path's actions are taken again going forward, so the path and its costs are as if found by a forward search).
+    """
+    state = forward_node
+    node = backward_node
+    while node.parent is not None:
+        state = state.get_next_state(node.last_action)
+        node = node.parent
+    return state
+
+
+class BidirectionalBreadthFirstSearch(GoalSearchAgent):
+    """
+    Bidirectional Breadth-First Search.
+
+    Extends whole layers of states (all of the same depth) at a time, forward from the initial state or backward from
+    the goal states, whichever layer is smaller. Each search keeps the first node it finds for every state
+    (so it is a graph search). Once a layer meets the other search, the shortest joined path through that layer is returned,
+    which has the fewest actions of any solution.
+    """
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform a bidirectional BFS between the initial_state and the goal states.
+        States whose depth (in either search) exceeds the cutoff are never enqueued.
+        Returns None if there is no solution (within the cutoff), or if gui_callback_fn ended the search early.
+        """
+        get_id = self.state_index.get_id
+        forward_seen : Dict[int, StateNode] = {get_id(initial_state) : initial_state}
+        backward_seen : Dict[int, StateNode] = {}
+        for goal in initial_state.get_goal_states():
+            backward_seen.setdefault(get_id(goal), goal)
+        meeting = backward_seen.get(get_id(initial_state))
+        if meeting is not None:
+            return join_paths(initial_state, meeting)
+
+        forward_layer : List[StateNode] = [initial_state]
+        backward_layer : List[StateNode] = list(backward_seen.values())
+        while forward_layer and backward_layer:
+            forward = len(forward_layer) <= len(backward_layer)
+            layer, seen, other_seen = (forward_layer, forward_seen, backward_seen) if forward else (backward_layer, backward_seen, forward_seen)
+            next_layer : List[StateNode] = []
+            best : Optional[Tuple[StateNode, StateNode]] = None
+            for ext_node in layer:
+                if(gui_callback_fn(ext_node)):
+                    return None
+
+                self.total_extends += 1
+
+                for neighbor in (generate_neighbor_states(ext_node) if forward else ext_node.get_previous_states()):
+                    if neighbor.depth >= cutoff:
+                        continue
+                    self.total_enqueues += 1
+                    neighbor_id = get_id(neighbor)
+                    if neighbor_id in seen:
+                        continue
+                    seen[neighbor_id] = neighbor
+                    next_layer.append(neighbor)
+                    met = other_seen.get(neighbor_id)
+                    if met is not None and (best is None or met.depth < best[1].depth):
+                        best = (neighbor, met)
+
+            if best is not None:
+                return join_paths(*best) if forward else join_paths(best[1], best[0])
+            if forward:
+                forward_layer = next_layer
+            else:
+                backward_layer = next_layer
+
+        return None
+
+
+class MeetInTheMiddleFrontier:
+    """
+    The open states of one direction of a bidirectional A* (MM) search, plus the cheapest node found so far for every state.
+
+    Open nodes are kept in three heaps, by MM priority, by f and by path cost (g), since the stopping condition needs the
+    smallest of each. Nodes that are no longer open (extended, or replaced by a cheaper node for their state) are
+    skipped lazily when they reach the top of a heap.
+    """
+    heuristic : Callable[[StateNode],float]
+    state_index : StateIndex
+    best : Dict[int, StateNode]
+    open : Dict[int, StateNode]
+    heaps : Tuple[List[Tuple[float, int, int, StateNode]], ...]
+    counter : Iterator[int]
+
+    def __init__(self, heuristic : Callable[[StateNode],float], state_index : StateIndex):
+        self.heuristic = heuristic
+        self.state_index = state_index
+        self.best = {}
+        self.open = {}
+        self.heaps = ([], [], []) # by priority, f, and g
+        self.counter = count()
+
+    def __len__(self) -> int:
+        return len(self.open)
+
+    def push(self, state : StateNode) -> Optional[int]:
+        """ Open the state (with priority max(f, 2g)), unless a node for it at least as cheap was already found.
+        Returns the state's ID if it was opened, otherwise None.
+        """
+        state_id = self.state_index.get_id(state)
+        best = self.best.get(state_id)
+        if best is not None and best.path_cost <= state.path_cost:
+            return None
+        self.best[state_id] = state
+        self.open[state_id] = state
+        g = state.path_cost
+        f = g + self.heuristic(state)
+        n = next(self.counter)
+        for heap, value in zip(self.heaps, (max(f, 2 * g), f, g)):
+            heapq.heappush(heap, (value, n, state_id, state))
+        return state_id
+
+    def get_min(self, which : int) -> float:
+        """ The smallest priority (which = 0), f (which = 1) or g (which = 2) of the open states, or INF if there are none."""
+        heap = self.heaps[which]
+        while heap and self.open.get(heap[0][2]) is not heap[0][3]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else INF
+
+    def pop(self) -> StateNode:
+        """ Remove and return the open node with the lowest priority."""
+        self.get_min(0)
+        _, _, state_id, state = heapq.heappop(self.heaps[0])
+        del self.open[state_id]
+        return state
+
+
+class BidirectionalAStarSearch(InformedSearchAgent):
+    """
+    Bidirectional A*, using the MM ("meet in the middle") algorithm.
+
+    Each direction prioritizes its open states by max(f, 2g), which guarantees that neither search goes past the
+    middle of an optimal path. Whenever a state is reached by both searches, the joined path's cost is a candidate
+    solution; the search stops once the best candidate is no more than a lower bound on any other solution's cost.
+    With an admissible heuristic, the solution is optimal.
+
+    The heuristic estimates the remaining cost to the goal, which informs the forward search. The backward search uses
+    the heuristic's estimate of the cost from the initial state (see search_heuristics.get_backward_heuristic),
+    or is uninformed (its heuristic is 0) if the heuristic has none.
+
+    Both searches have to reach the middle before the solution is known to be optimal, so with a weak heuristic
+    (like the Manhattan distance in a maze of corridors) this can extend more states than A*.
+    """
+    def search(self,
+            initial_state : StateNode,
+            gui_callback_fn : Callable[[StateNode],bool] = lambda n : False,
+            cutoff : Union[int, float] = INF
+            ) -> Optional[StateNode]:
+        """ Perform a bidirectional A* (MM) search between the initial_state and the goal states.
+        States whose path cost (in either search) exceeds the cutoff are never enqueued.
+        Returns None if there is no solution (within the cutoff), or if gui_callback_fn ended the search early.
+        """
+        forward = MeetInTheMiddleFrontier(self.heuristic, self.state_index)
+        backward = MeetInTheMiddleFrontier(get_backward_heuristic(self.heuristic, initial_state), self.state_index)
+        best_cost = INF
+        meeting : Optional[Tuple[StateNode, StateNode]] = None
+
+        def push(frontier : MeetInTheMiddleFrontier, other : MeetInTheMiddleFrontier, state : StateNode) -> Optional[Tuple[StateNode, StateNode]]:
+            """ Push the state, and return (state, the other search's node for it) if that makes a cheaper solution."""
+            state_id = frontier.push(state)
+            if state_id is not None:
+                met = other.best.get(state_id)
+                if met is not None and state.path_cost + met.path_cost < best_cost:
+                    return state, met
+            return None
+
+        forward.push(initial_state)
+        for goal in initial_state.get_goal_states():
+            met = push(backward, forward, goal)
+            if met is not None:
+                best_cost, meeting = 0, (met[1], met[0])
+
+        while forward and backward:
+            forward_priority = forward.get_min(0)
+            backward_priority = backward.get_min(0)
+            lower_bound = max(min(forward_priority, backward_priority), forward.get_min(1), backward.get_min(1),
+                                forward.get_min(2) + backward.get_min(2))
+            if best_cost <= lower_bound:
+                break
+
+            is_forward = forward_priority <= backward_priority
+            frontier, other = (forward, backward) if is_forward else (backward, forward)
+            ext_node = frontier.pop()
+
+            if(gui_callback_fn(ext_node)):
+                return None
+
+            self.total_extends += 1
+
+            for neighbor in (generate_neighbor_states(ext_node) if is_forward else ext_node.get_previous_states()):
+                if neighbor.path_cost >= cutoff:
+                    continue
+                self.total_enqueues += 1
+                met = push(frontier, other, neighbor)
+                if met is not None:
+                    best_cost = met[0].path_cost + met[1].path_cost
+                    meeting = met if is_forward else (met[1], met[0])
+
+        if meeting is None:
+            return None
+        return join_paths(*meeting)
+
+
+# Collection of all the above
 
 ALGORITHMS : Dict[str, Type[GoalSearchAgent] ] = {
     "tree": TreeSearchAlgorithm, 
@@ -565,6 +1601,7 @@ ALGORITHMS : Dict[str, Type[GoalSearchAgent] ] = {
 
 if EXTRA_STUFF:
     ALGORITHMS["tree-no-tail-bite"] = TreeSearchNoTailBiteAlgorithm
+    ALGORITHMS["jump-point"] = JumpPointSearchAlgorithm
 
 
 STRATEGIES : Dict[str, Type[GoalSearchAgent] ] = {
@@ -574,6 +1611,7 @@ STRATEGIES : Dict[str, Type[GoalSearchAgent] ] = {
     "ucs": UniformCostSearch,
     "greedy": GreedyBestSearch,
     "astar": AStarSearch,
+    "wastar": WeightedAStarSearch,
 }
 
 if EXTRA_STUFF:
@@ -591,6 +1629,48 @@ for alg in ALGORITHMS:
         ALL_AGENTS[alg][strat] = type(alg + "-" + strat, (ALGORITHMS[alg], STRATEGIES[strat]), {})
 
 
+"""
+Agents that are a complete algorithm and strategy by themselves.
+They are listed with the ALGORITHMS (so they can be selected in the GUI),
+but in ALL_AGENTS only under STANDALONE_STRATEGY, since the strategy makes no difference to them
+(see get_agent_class and get_agent_strategies).
+"""
+STANDALONE_AGENTS : Dict[str, Type[GoalSearchAgent] ] = {
+    "ida*": IterativeDeepeningAStarSearch,
+    "rbfs": RecursiveBestFirstSearch,
+    "sma*": SimplifiedMemoryBoundedAStarSearch,
+    "ara*": AnytimeRepairingAStarSearch,
+    "bidirectional-bfs": BidirectionalBreadthFirstSearch,
+    "bidirectional-a*": BidirectionalAStarSearch,
+}
+
+STANDALONE_STRATEGY = "astar"
+
+for alg in STANDALONE_AGENTS:
+    ALGORITHMS[alg] = STANDALONE_AGENTS[alg]
+    ALL_AGENTS[alg] = {STANDALONE_STRATEGY : STANDALONE_AGENTS[alg]}
+
+
+def get_agent_strategies(alg : str, strategies : Iterable[str], all_agents : Dict[str, Dict[str, Type[GoalSearchAgent]]] = ALL_AGENTS) -> List[str]:
+    """ The strategies (of those given) that make a distinct agent when combined with the algorithm.
+    An algorithm registered under a single strategy (like the STANDALONE_AGENTS) only has that one,
+    whichever strategies are given, so it is only run once.
+    """
+    agents = all_agents[alg]
+    if len(agents) == 1:
+        return list(agents)
+    return [strat for strat in strategies if strat in agents]
+
+def get_agent_class(alg : str, strat : str, all_agents : Dict[str, Dict[str, Type[GoalSearchAgent]]] = ALL_AGENTS) -> Type[GoalSearchAgent]:
+    """ The agent class for the algorithm and strategy. The strategy is ignored for an algorithm
+    registered under a single strategy (like the STANDALONE_AGENTS).
+    """
+    agents = all_agents[alg]
+    if len(agents) == 1:
+        return next(iter(agents.values()))
+    return agents[strat]
+
+
 ### Completely Optional Extensions ########################################################
 
 """ If you're bored, try any of the following extensions!
@@ -603,10 +1683,8 @@ for alg in ALGORITHMS:
  Write a script to open and test different slide puzzle boards.
  """
 
-# from slidepuzzle_problem import SlidePuzzleState
-# def is_solvable(board : SlidePuzzleState):
-#     """is this board solvable? return a boolean"""
-#     raise NotImplementedError
+# Implemented as SlidePuzzleState.is_solvable (see StateNode.is_solvable),
+# which the batch runner and the GUI check before searching.
 
 
 """ B) A* is optimal, but its memory usage is still prohibitive for large state spaces.
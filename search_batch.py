@@ -0,0 +1,345 @@
+"""
+Headless batch runner for the goal search agents.
+Solves every problem file matched by a glob with every requested combination of
+algorithm, strategy and heuristic, and writes one CSV row per run.
+
+Usage:
+> python search_batch.py PROBLEM FILE_GLOB [-a ALG ...] [-s STRAT ...] [-H HEURISTIC ...] [-c CUTOFF] [-o OUT.csv]
+                         [-j WORKERS] [--time-limit SECS] [--max-extends N] [--max-memory BYTES]
+
+For example:
+> python search_batch.py slidepuzzle "slidepuzzle_files/test_puzzle3x3-*.slidepuzzle" -a graph -s astar greedy -H Manhattan Hamming
+
+With -j, the runs are spread across a pool of worker processes (-j 0 uses every core).
+Results are still written in the same order as a sequential run.
+"""
+from __future__ import annotations
+from typing import List, Tuple, Callable, Optional, Union, Dict, Type, Any, Iterable, Sequence, TextIO
+import argparse
+import csv
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from glob import glob
+from itertools import product
+from time import perf_counter
+
+from search_problem import StateNode
+from search_heuristics import HeuristicCache, precompute_heuristic
+from search_algorithms import GoalSearchAgent, ALGORITHMS, STRATEGIES, ALL_AGENTS, PRIORITY_QUEUES, TIE_BREAKS, get_agent_class, get_agent_strategies
+from roomba_problem import RoombaState
+from roomba_heuristics import ROOMBA_HEURISTICS
+from spotlessroomba_problem import SpotlessRoombaState
+from spotlessroomba_heuristics import SPOTLESSROOMBA_HEURISTICS
+import slidepuzzle_problem
+from slidepuzzle_problem import SlidePuzzleState
+from slidepuzzle_heuristics import SLIDEPUZZLE_HEURISTICS
+from graph_problem import GraphState
+from graph_heuristics import GRAPH_HEURISTICS
+
+INF = float('inf')
+
+"""The problem types that can be batch solved, with their StateNode class and named heuristics."""
+PROBLEMS : Dict[str, Tuple[Type[StateNode], Dict[str, Callable[[StateNode], float]]]] = {
+    "roomba": (RoombaState, ROOMBA_HEURISTICS),
+    "spotlessroomba": (SpotlessRoombaState, SPOTLESSROOMBA_HEURISTICS),
+    "slidepuzzle": (SlidePuzzleState, SLIDEPUZZLE_HEURISTICS),
+    "graph": (GraphState, GRAPH_HEURISTICS),
+}
+
+# The assignment starter slidepuzzle_problem.py has no bit-packed state, so that problem type is only offered if it's there
+if hasattr(slidepuzzle_problem, "PackedSlidePuzzleState"):
+    PROBLEMS["packedslidepuzzle"] = (slidepuzzle_problem.PackedSlidePuzzleState, SLIDEPUZZLE_HEURISTICS)
+
+""" Search outcomes, named like the GUI's finished statuses """
+SUCCESS = "success"
+INCOMPLETE = "incomplete"
+FAILURE = "failure"
+""" Outcome for initial states that StateNode.is_solvable rules out, so they are never searched """
+UNSOLVABLE = "unsolvable"
+""" Outcomes for searches ended early by a SearchLimits """
+TIMEOUT = "timeout"
+NODE_LIMIT = "node-limit"
+MEMORY_LIMIT = "memory-limit"
+CANCELLED = "cancelled"
+""" Outcome for runs that raised an exception (the row's error field has the message) """
+ERROR = "error"
+
+"""The columns of a result row, in order."""
+RESULT_FIELDS : Tuple[str, ...] = ("file", "algorithm", "strategy", "heuristic", "outcome",
+    "cost", "depth", "total_extends", "total_enqueues", "wall_time", "precompute_time", "peak_memory", "heuristic_hits", "heuristic_misses", "error")
+
+
+class SearchLimits:
+    """
+    A gui_callback_fn that ends a search once it runs past a time, extend, or memory limit,
+    or once another process sets its stop_event (a multiprocessing.Event), if it has one.
+    Limits are checked each time the agent is about to extend a node, so they are not exact:
+    nothing outside the search loop (like a heuristic's precomputation), or within a single extend, is interrupted.
+
+    After the search, stopped_by names the limit that ended it (TIMEOUT, NODE_LIMIT, MEMORY_LIMIT or CANCELLED), or is None.
+    The memory limit is measured with tracemalloc, so it is only enforced while tracemalloc is tracing.
+    """
+    agent : GoalSearchAgent
+    time_limit : float
+    max_extends : float
+    max_memory : float
+    stop_event : Optional[Any]
+    start_time : float
+    stopped_by : Optional[str]
+
+    def __init__(self, agent : GoalSearchAgent, time_limit : float = INF, max_extends : float = INF, max_memory : float = INF,
+            stop_event : Optional[Any] = None):
+        self.agent = agent
+        self.time_limit = time_limit
+        self.max_extends = max_extends
+        self.max_memory = max_memory
+        self.stop_event = stop_event
+        self.start_time = perf_counter()
+        self.stopped_by = None
+
+    def __call__(self, node : StateNode) -> bool:
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.stopped_by = CANCELLED
+        elif self.agent.total_extends >= self.max_extends:
+            self.stopped_by = NODE_LIMIT
+        elif perf_counter() - self.start_time > self.time_limit:
+            self.stopped_by = TIMEOUT
+        elif self.max_memory < INF and tracemalloc.get_traced_memory()[0] > self.max_memory:
+            self.stopped_by = MEMORY_LIMIT
+        return self.stopped_by is not None
+
+
+def solve(initial_state : StateNode,
+        agent_class : Type[GoalSearchAgent],
+        heuristic : Callable[[StateNode], float],
+        cutoff : Union[int, float] = INF,
+        trace_memory : bool = True,
+        time_limit : float = INF,
+        max_extends : float = INF,
+        max_memory : float = INF,
+        stop_event : Optional[Any] = None,
+        agent_kwargs : Optional[Dict[str, Any]] = None
+        ) -> Tuple[Optional[StateNode], Dict[str, Any]]:
+    """ Run a single search without any GUI. Return the StateNode the agent returned (or None),
+    and the partial result row (outcome, cost, depth, total_extends, total_enqueues, wall_time, precompute_time, peak_memory,
+    heuristic_hits, heuristic_misses).
+
+    agent_kwargs are passed to the agent's constructor, along with the heuristic (e.g. max_nodes for SMA*).
+    Agents ignore any that they don't use.
+
+    peak_memory is the peak number of bytes allocated during the search, as measured by tracemalloc.
+    Tracing memory slows down the search, so it can be turned off (unless there is a max_memory);
+    peak_memory is then None.
+
+    precompute_time is the time the heuristic took to prepare its precomputed values before the search (not part of wall_time),
+    or None if it has none (see search_heuristics.precompute_heuristic). Precomputed values are usually kept with the problem,
+    so only the first search of each problem (in each process) pays for them.
+
+    heuristic_hits and heuristic_misses are the agent's HeuristicCache statistics,
+    or None if its heuristic isn't cached (see the heuristic_cache agent argument).
+
+    If the search is ended by one of the limits, the outcome is the limit's name,
+    and cost/depth describe whatever (partial) path the agent returned, if any.
+
+    The initial state's is_solvable() is checked first; if it is not solvable, there is no search,
+    and the outcome is UNSOLVABLE (wall_time is the time the check took).
+    """
+    start_time = perf_counter()
+    if not initial_state.is_solvable():
+        return None, {"outcome": UNSOLVABLE, "cost": None, "depth": None, "total_extends": 0, "total_enqueues": 0,
+                "wall_time": perf_counter() - start_time, "precompute_time": None, "peak_memory": None, "heuristic_hits": None, "heuristic_misses": None}
+
+    precompute_time = precompute_heuristic(heuristic, initial_state)
+    agent = agent_class(heuristic = heuristic, **(agent_kwargs or {}))
+    trace_memory = trace_memory or max_memory < INF
+    if trace_memory:
+        tracemalloc.start()
+    try:
+        limits = SearchLimits(agent, time_limit = time_limit, max_extends = max_extends, max_memory = max_memory, stop_event = stop_event)
+        start_time = perf_counter()
+        solution_state = agent.search(initial_state = initial_state.get_as_root_node(), gui_callback_fn = limits, cutoff = cutoff)
+        elapsed_time = perf_counter() - start_time
+        peak_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    cache = getattr(agent, "heuristic", None)
+    if not isinstance(cache, HeuristicCache):
+        cache = None
+    if limits.stopped_by is not None:
+        outcome = limits.stopped_by
+    elif solution_state is None:
+        outcome = FAILURE
+    elif solution_state.is_goal_state():
+        outcome = SUCCESS
+    else:
+        outcome = INCOMPLETE
+    return solution_state, {"outcome": outcome,
+            "cost": solution_state.path_cost if solution_state is not None else None,
+            "depth": solution_state.depth if solution_state is not None else None,
+            "total_extends": agent.total_extends,
+            "total_enqueues": agent.total_enqueues,
+            "wall_time": elapsed_time,
+            "precompute_time": precompute_time,
+            "peak_memory": peak_memory,
+            "heuristic_hits": cache.hits if cache is not None else None,
+            "heuristic_misses": cache.misses if cache is not None else None}
+
+
+def run_search(initial_state : StateNode,
+        agent_class : Type[GoalSearchAgent],
+        heuristic : Callable[[StateNode], float],
+        **search_kwargs
+        ) -> Dict[str, Any]:
+    """ Run a single search without any GUI, and return only its partial result row. See solve()."""
+    return solve(initial_state, agent_class, heuristic, **search_kwargs)[1]
+
+
+@lru_cache(maxsize = 16)
+def load_problem(problem : str, filename : str) -> StateNode:
+    """ Read the initial state of a problem file. 
+    Cached, so that each (worker) process only reads each file once.
+    """
+    return PROBLEMS[problem][0].readFromFile(filename)
+
+
+def run_job(job : Tuple[str, str, str, str, str], **search_kwargs) -> Dict[str, Any]:
+    """ Run one (problem, filename, algorithm, strategy, heuristic) job, and return its full result row.
+    Jobs are only names, so they are cheap to send to worker processes.
+    Any keyword arguments are passed along to run_search.
+
+    If the run raises an exception (e.g. the environment doesn't support the algorithm), the row's outcome is ERROR
+    and its error field describes the exception, so that one bad job doesn't end the whole batch.
+    """
+    problem, filename, alg, strat, heur = job
+    row : Dict[str, Any] = {"file": filename, "algorithm": alg, "strategy": strat, "heuristic": heur}
+    try:
+        row.update(run_search(load_problem(problem, filename), get_agent_class(alg, strat), PROBLEMS[problem][1][heur], **search_kwargs))
+    except Exception as e:
+        row.update(error_row(e))
+    return row
+
+
+def error_row(error : Exception) -> Dict[str, Any]:
+    """ The partial result row of a run that raised the exception (with its message on one line). """
+    return {"outcome": ERROR, "error": "{}: {}".format(type(error).__name__, " ".join(str(error).split()))}
+
+
+def run_batch(problem : str,
+        filenames : Iterable[str],
+        algorithms : Sequence[str],
+        strategies : Sequence[str],
+        heuristics : Sequence[str],
+        workers : Optional[int] = 1,
+        **search_kwargs
+        ) -> Iterable[Dict[str, Any]]:
+    """ Solve every file with every combination of algorithm, strategy and heuristic,
+    yielding one full result row (see RESULT_FIELDS) per run, in that order.
+
+    With workers == 1 the runs happen one after another in this process.
+    Otherwise they are spread across a pool of that many worker processes (None for one per CPU core),
+    and the rows are still yielded in order as they complete.
+    Standalone agents (like ida*) are only run once, under their one strategy, whatever the strategies (see get_agent_strategies).
+    Any keyword arguments (cutoff, trace_memory, and the limits) are passed along to run_search.
+    """
+    agents = [(alg, strat) for alg in algorithms for strat in get_agent_strategies(alg, strategies)]
+    jobs = [(problem, filename, alg, strat, heur)
+            for filename in filenames
+            for (alg, strat), heur in product(agents, heuristics)]
+    if workers == 1:
+        for job in jobs:
+            yield run_job(job, **search_kwargs)
+    else:
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            yield from executor.map(partial(run_job, **search_kwargs), jobs)
+
+
+def write_results(rows : Iterable[Dict[str, Any]], out : TextIO):
+    """ Write result rows as CSV, flushing after every row so that partial results survive long runs."""
+    writer = csv.DictWriter(out, fieldnames = RESULT_FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        out.flush()
+
+
+def add_agent_arguments(parser : argparse.ArgumentParser):
+    """ Add the command line options that configure the agents themselves (see get_agent_kwargs)."""
+    parser.add_argument("--max-nodes", type = float, default = INF, help = "node budget for memory-bounded agents like sma* (default: INF)")
+    parser.add_argument("--max-bytes", type = float, default = INF, help = "estimated byte budget for memory-bounded agents like sma* (default: INF)")
+    parser.add_argument("--priority-queue", default = "bucket", choices = PRIORITY_QUEUES.keys(),
+                        help = "frontier priority queue for priority-based strategies (default: bucket)")
+    parser.add_argument("--tie-break", default = None, choices = TIE_BREAKS.keys(),
+                        help = "how priority-based strategies break ties between equal priorities (default: deep for greedy and the A* variants, fifo for the others)")
+    parser.add_argument("--heuristic-cache", type = float, default = 0, metavar = "SIZE",
+                        help = "cache up to SIZE heuristic values per search (INF for no limit; default: 0, no cache)")
+    parser.add_argument("--weight", type = float, default = 2.0,
+                        help = "heuristic weight w for wastar, and the first weight for ara* (default: 2.0)")
+    parser.add_argument("--weight-step", type = float, default = 0.5,
+                        help = "how much ara* lowers its weight after each solution (default: 0.5)")
+
+
+def get_agent_kwargs(args : argparse.Namespace) -> Dict[str, Any]:
+    """ The agent constructor keyword arguments given by the options from add_agent_arguments.
+    The tie-break policy is left out unless it was given, so each agent uses its own default.
+    """
+    kwargs = {"max_nodes": args.max_nodes, "max_bytes": args.max_bytes, "priority_queue": args.priority_queue,
+            "heuristic_cache": args.heuristic_cache, "weight": args.weight, "weight_step": args.weight_step}
+    if args.tie_break is not None:
+        kwargs["tie_break"] = args.tie_break
+    return kwargs
+
+
+def make_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description = "Run goal search agents headlessly over many problem files.")
+    parser.add_argument("problem", choices = PROBLEMS.keys(), help = "the problem type of the files")
+    parser.add_argument("files", help = "glob of problem files to solve, e.g. 'slidepuzzle_files/*.slidepuzzle'")
+    parser.add_argument("-a", "--algorithms", nargs = "+", default = ["graph"], choices = ALGORITHMS.keys(), metavar = "ALG",
+                        help = "algorithm names (default: graph). Choices: " + ", ".join(ALGORITHMS.keys()))
+    parser.add_argument("-s", "--strategies", nargs = "+", default = ["astar"], choices = STRATEGIES.keys(), metavar = "STRAT",
+                        help = "strategy names (default: astar). Choices: " + ", ".join(STRATEGIES.keys()))
+    parser.add_argument("-H", "--heuristics", nargs = "+", default = None, metavar = "HEURISTIC",
+                        help = "heuristic names from the problem's heuristics (default: all of them)")
+    parser.add_argument("-c", "--cutoff", type = float, default = INF, help = "length/cost cutoff (default: INF)")
+    parser.add_argument("-o", "--output", default = None, help = "CSV file to write results to (default: stdout)")
+    parser.add_argument("--no-memory", action = "store_true", help = "don't trace peak memory (faster)")
+    parser.add_argument("-j", "--workers", type = int, default = 1, help = "number of worker processes (default: 1, 0 for one per CPU core)")
+    parser.add_argument("--time-limit", type = float, default = INF, help = "seconds before a run is stopped (default: INF). It is checked between extends, "
+                        "so a heuristic's precomputation or a single very slow extend can run past it")
+    parser.add_argument("--max-extends", type = float, default = INF, help = "extends before a run is stopped (default: INF)")
+    parser.add_argument("--max-memory", type = float, default = INF, help = "bytes allocated before a run is stopped (default: INF)")
+    add_agent_arguments(parser)
+    return parser
+
+
+def main(argv : Optional[Sequence[str]] = None):
+    parser = make_arg_parser()
+    args = parser.parse_args(argv)
+
+    problem_heuristics = PROBLEMS[args.problem][1]
+    heuristics : List[str] = args.heuristics if args.heuristics is not None else list(problem_heuristics.keys())
+    for heur in heuristics:
+        if heur not in problem_heuristics:
+            parser.error("unknown heuristic {!r} for {}. Choices: {}".format(heur, args.problem, ", ".join(problem_heuristics.keys())))
+
+    filenames = sorted(glob(args.files))
+    if not filenames:
+        parser.error("no files match {!r}".format(args.files))
+
+    rows = run_batch(args.problem, filenames, args.algorithms, args.strategies, heuristics,
+                    workers = args.workers if args.workers > 0 else None,
+                    cutoff = args.cutoff, trace_memory = not args.no_memory,
+                    time_limit = args.time_limit, max_extends = args.max_extends, max_memory = args.max_memory,
+                    agent_kwargs = get_agent_kwargs(args))
+    if args.output is None:
+        write_results(rows, sys.stdout)
+    else:
+        with open(args.output, 'w', newline = '') as out:
+            write_results(rows, out)
+
+
+if __name__ == "__main__":
+    main()
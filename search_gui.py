@@ -21,6 +21,10 @@ class Search_GUI(Tk):
 
     CUTOFF_OPTIONS : List[str] = [ str(x) for x in range(1,10)] + [str(x) for x in range(10,100,10)] + [str(x) for x in range(100,1000,100)] + ['1000', 'INF']
 
+    MAX_NODES_OPTIONS : List[str] = [str(x) for x in (10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 20000, 50000, 100000, 1000000)] + ['INF']
+
+    WEIGHT_OPTIONS : List[str] = [str(x) for x in (1.0, 1.1, 1.2, 1.3, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0)]
+
     def __init__(self, canvas_height : int, canvas_width : int, algorithm_names : Sequence[str], strategy_names : Sequence[str], heuristics : Dict[str, Callable[[StateNode], float]]):
         super().__init__()
         self.heuristics = heuristics
@@ -105,6 +109,24 @@ class Search_GUI(Tk):
         while(self.cutoff_spinbox.get() != "INF") :
             self.cutoff_spinbox.invoke('buttonup')
 
+        max_nodes_label = Label(cutoffs_frame, text="Memory Limit (nodes):")
+        max_nodes_label.grid(row = 1, column = 0, sticky = NW)
+
+        self.max_nodes_spinbox = Spinbox(cutoffs_frame,
+            values=Search_GUI.MAX_NODES_OPTIONS, width = 7, wrap = True)
+        self.max_nodes_spinbox.grid(row= 1, column = 1, sticky = NW, padx = 5)
+        while(self.max_nodes_spinbox.get() != "INF") :
+            self.max_nodes_spinbox.invoke('buttonup')
+
+        weight_label = Label(cutoffs_frame, text="Heuristic Weight (w):")
+        weight_label.grid(row = 2, column = 0, sticky = NW)
+
+        self.weight_spinbox = Spinbox(cutoffs_frame,
+            values=Search_GUI.WEIGHT_OPTIONS, width = 5, wrap = True)
+        self.weight_spinbox.grid(row= 2, column = 1, sticky = NW, padx = 5)
+        while(self.weight_spinbox.get() != "2.0") :
+            self.weight_spinbox.invoke('buttonup')
+
 
         self.reset_button = Button(controls_frame, text="Terminate Search", # End Search early / restart
                             width = 15, pady = 3)
@@ -219,6 +241,14 @@ class Search_GUI(Tk):
     def get_cutoff(self):
         return float(self.cutoff_spinbox.get())
 
+    def get_max_nodes(self):
+        """ The node budget for memory-bounded agents (e.g. SMA*)"""
+        return float(self.max_nodes_spinbox.get())
+
+    def get_weight(self):
+        """ The heuristic weight for Weighted A* (and the first weight for ARA*)"""
+        return float(self.weight_spinbox.get())
+
     def get_algorithm_selection(self) -> str:
         return self.algorithm_listbox.get(self.algorithm_listbox.curselection()[0])
 
@@ -314,6 +344,8 @@ class Waiting_Base(Status):
 
         # Can choose new algorithm settings
         gui.cutoff_spinbox['state'] = NORMAL
+        gui.max_nodes_spinbox['state'] = NORMAL
+        gui.weight_spinbox['state'] = NORMAL
 
         gui.algorithm_listbox['state'] = NORMAL
         gui.strategy_listbox['state'] = NORMAL
@@ -419,6 +451,21 @@ class Finished_Incomplete_Waiting(Waiting_Base):
     def update_ui(gui : Search_GUI):
         Waiting_Base.update_ui(gui)
 
+class Finished_Unsolvable_Waiting(Waiting_Base):
+    @staticmethod
+    def is_valid_transition_to(next_status: Type[Status]):
+        return next_status in (Initial_Waiting,Interactive_Waiting, Running, Running_Paused, Running_Step, Running_Blind)
+    @staticmethod
+    def get_status_text(alg : str):
+        return "The initial state is unsolvable - {} was not run.".format(alg)
+
+    @staticmethod
+    def update_ui(gui : Search_GUI):
+        Waiting_Base.update_ui(gui)
+        gui.run_pause_button['state'] = DISABLED
+        gui.step_button['state'] = DISABLED
+        gui.fly_blind_search_button['state'] = DISABLED        
+
 class Terminated_Waiting(Waiting_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
@@ -435,6 +482,8 @@ class Running_Base(Status):
         gui.reset_button['bg'] = 'red'
 
         gui.cutoff_spinbox['state'] = "readonly"
+        gui.max_nodes_spinbox['state'] = "readonly"
+        gui.weight_spinbox['state'] = "readonly"
 
         # Cannot choose new algorithm settings during execution, give at least visual indication
         gui.algorithm_listbox['state'] = DISABLED
@@ -464,7 +513,7 @@ class Running(Running_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
         return next_status in (Running_Paused, Running_Step, Running_Blind, 
-                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Algorithm_Error)
+                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Finished_Unsolvable_Waiting, Algorithm_Error)
 
     @staticmethod
     def get_status_text(alg : str):
@@ -493,7 +542,7 @@ class Running_Step(Running_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
         return next_status in (Running_Paused, Running, Running_Blind, 
-                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Algorithm_Error)
+                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Finished_Unsolvable_Waiting, Algorithm_Error)
     @staticmethod
     def get_status_text(alg : str):
         return "{} is taking one step...".format(alg),
@@ -531,7 +580,7 @@ class Running_Paused(Running_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
         return next_status in (Running_Step, Running, Running_Blind, 
-                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Algorithm_Error)
+                                Running_Terminating, Finished_Success_Waiting, Finished_Failure_Waiting, Finished_Incomplete_Waiting, Finished_Unsolvable_Waiting, Algorithm_Error)
 
     @staticmethod
     def get_status_text(alg : str):
@@ -569,7 +618,7 @@ class Running_Paused(Running_Base):
 class Running_Blind(Running_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
-        return next_status in (Finished_Success_Waiting, Finished_Failure_Waiting,  Finished_Incomplete_Waiting, Algorithm_Error)
+        return next_status in (Finished_Success_Waiting, Finished_Failure_Waiting,  Finished_Incomplete_Waiting, Finished_Unsolvable_Waiting, Algorithm_Error)
 
     @staticmethod
     def get_status_text(alg : str):
@@ -590,7 +639,7 @@ class Running_Blind(Running_Base):
 class Running_Terminating(Running_Base):
     @staticmethod
     def is_valid_transition_to(next_status: Type[Status]):
-        return next_status in (Terminated_Waiting, Algorithm_Error, Finished_Failure_Waiting, Finished_Success_Waiting, Finished_Incomplete_Waiting)
+        return next_status in (Terminated_Waiting, Algorithm_Error, Finished_Failure_Waiting, Finished_Success_Waiting, Finished_Incomplete_Waiting, Finished_Unsolvable_Waiting)
 
     @staticmethod
     def get_status_text(alg : str):
@@ -678,6 +727,15 @@ class Search_GUI_Controller:
         self.gui.fly_blind_search_button['command'] = lambda : self.status.handle_fly_blind_search_button(self)
         self.gui.run_pause_button['command'] = lambda : self.status.handle_run_pause_button(self)
         self.gui.step_button['command'] = lambda : self.status.handle_step_button(self)
+        self.gui.algorithm_listbox.bind('<<ListboxSelect>>', lambda e : self.handle_algorithm_selection())
+
+    def handle_algorithm_selection(self):
+        """ Algorithms that only work with one strategy (like the standalone agents) select it, to show which applies."""
+        strategies = list(self.all_agents[self.gui.get_algorithm_selection()])
+        names = self.gui.strategy_listbox.get(0, END)
+        if len(strategies) == 1 and strategies[0] in names:
+            self.gui.strategy_listbox.select_clear(0, END)
+            self.gui.strategy_listbox.select_set(names.index(strategies[0]))
 
 
     def update_status_and_ui(self, newstatus : Type[Status]):
@@ -702,13 +760,28 @@ class Search_GUI_Controller:
         except Exception:
             self.gui.status_label['text'] = ("Cutoff is not a valid number. ('INF' for no limit)")
             return False
+        try:
+            self.gui.get_max_nodes()
+        except Exception:
+            self.gui.status_label['text'] = ("Memory limit is not a valid number. ('INF' for no limit)")
+            return False
+        try:
+            if self.gui.get_weight() < 1:
+                raise ValueError
+        except Exception:
+            self.gui.status_label['text'] = ("Heuristic weight must be a number, at least 1.")
+            return False
         return True
 
     def get_agent_selection(self) -> GoalSearchAgent:
         alg = self.gui.get_algorithm_selection()
         strat = self.gui.get_strategy_selection()
-        agent_class = self.all_agents[alg][strat]
-        return agent_class(heuristic = self.gui.get_heuristic_selection())
+        # Algorithms registered under a single strategy (like the standalone agents) ignore the strategy selection.
+        # (Looked up here, rather than with search_algorithms.get_agent_class, so the assignment starter files work too.)
+        agents = self.all_agents[alg]
+        agent_class = agents[strat] if strat in agents else next(iter(agents.values()))
+        return agent_class(heuristic = self.gui.get_heuristic_selection(), max_nodes = self.gui.get_max_nodes(),
+                            weight = self.gui.get_weight(), solution_callback = self.solution_callback)
 
 
 
@@ -719,6 +792,12 @@ class Search_GUI_Controller:
         self.current_agent = self.get_agent_selection()
         self.update_status_and_ui(status)
         try:
+            # No need to search if the initial state can't reach a goal (e.g. the slide puzzle's parity is wrong)
+            if not self.gui.current_state.is_solvable():
+                print("The initial state is unsolvable; {} was not run.".format(type(self.current_agent).__name__))
+                self.update_status_and_ui(Finished_Unsolvable_Waiting)
+                return
+
             start_time = time()
             solution_state : Optional[StateNode] = self.current_agent.search(initial_state = self.gui.current_state.get_as_root_node(),
                                                                     gui_callback_fn = self.alg_callback,
@@ -767,6 +846,12 @@ class Search_GUI_Controller:
 
     def alg_callback(self, node : StateNode) -> bool:
         return self.status.alg_callback(self, node)
+
+    def solution_callback(self, solution : StateNode, bound : float):
+        """ Show each solution found by an anytime agent (e.g. ARA*) while it keeps searching for better ones."""
+        print("Found a solution with cost {} (at most {:.3f} times the optimal cost).".format(solution.path_cost, bound))
+        self.gui.update_state(solution, please_draw=True, please_print=True, please_analyze=True)
+        self.gui.update_idletasks()
         
     def handle_history_button(self):
         path = self.gui.current_state.get_path()
@@ -1,3 +1,6 @@
+import functools
+from time import perf_counter
+from collections import OrderedDict
 from typing import *
 from search_problem import StateNode
 INF = float('inf')
@@ -11,3 +14,121 @@ def zero_heuristic(state : StateNode):
 def arbitrary_heuristic(state : StateNode):
     """ A arbitrary but deterministic heuristic . """
     return hash(state) % 100
+
+
+#### Heuristic caching #################################################
+
+class HeuristicCache:
+    """
+    Wraps a heuristic function, memoizing its value for each state (as given by get_state_features()),
+    so states that are generated again and again (e.g. by tree search) only have their heuristic computed once.
+
+    Only the maxsize most recently used values are kept (least recently used values are evicted first);
+    a maxsize of INF keeps every value. hits and misses count the calls that were and weren't answered from the cache.
+    """
+    heuristic : Callable[[StateNode], float]
+    maxsize : float
+    cache : OrderedDict
+    hits : int
+    misses : int
+
+    def __init__(self, heuristic : Callable[[StateNode], float], maxsize : float = INF):
+        functools.update_wrapper(self, heuristic)
+        self.heuristic = heuristic
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, state : StateNode) -> float:
+        key = state.get_cached_state_features()
+        value = self.cache.get(key)
+        if value is not None:
+            self.hits += 1
+            if self.maxsize < INF:
+                self.cache.move_to_end(key)
+            return value
+        self.misses += 1
+        value = self.cache[key] = self.heuristic(state)
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last = False)
+        return value
+
+    def clear(self):
+        """ Empty the cache and reset the hit/miss statistics. """
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+#### Incremental heuristics #################################################
+
+class IncrementalHeuristic:
+    """
+    Wraps a heuristic function that supports incremental evaluation: one with a "delta" attribute,
+    a function that takes a (non-root) StateNode and returns how much the heuristic value changed
+    from its parent's, without looking at the whole state.
+
+    The heuristic value of each node is kept on the node (in heuristic_value), so that a child's value is just
+    its parent's value plus the delta. The full heuristic is only computed for nodes with no known ancestor, like the root.
+    """
+    heuristic : Callable[[StateNode], float]
+    delta : Callable[[StateNode], float]
+
+    def __init__(self, heuristic : Callable[[StateNode], float]):
+        functools.update_wrapper(self, heuristic)
+        self.heuristic = heuristic
+        self.delta = getattr(heuristic, "delta")
+
+    def __call__(self, state : StateNode) -> float:
+        if state.heuristic_owner is self:
+            return cast(float, state.heuristic_value)
+        # Find the closest ancestor with a known value (usually the parent), then work back down to the state.
+        unknown = []
+        node : Optional[StateNode] = state
+        while node is not None and node.heuristic_owner is not self:
+            unknown.append(node)
+            node = node.parent
+        value = node.heuristic_value if node is not None else None
+        for node in reversed(unknown):
+            value = self.heuristic(node) if value is None else value + self.delta(node)
+            node.heuristic_owner = self
+            node.heuristic_value = value
+        return cast(float, value)
+
+
+def supports_incremental(heuristic : Callable[[StateNode], float]) -> bool:
+    """ Whether the heuristic function can be evaluated incrementally (see IncrementalHeuristic)."""
+    return getattr(heuristic, "delta", None) is not None
+
+
+#### Precomputed heuristics #################################################
+
+def precompute_heuristic(heuristic : Callable[[StateNode], float], state : StateNode) -> Optional[float]:
+    """ Prepare a heuristic for searching from the state, and return how many seconds that took.
+
+    Heuristics that are built from a table of precomputed values (like a pattern database) can have a "precompute" attribute,
+    a function that takes the initial state and does that work up front, so it isn't counted as part of the search.
+    Returns None if the heuristic has no precompute function.
+    """
+    precompute = getattr(heuristic, "precompute", None)
+    if precompute is None:
+        return None
+    start_time = perf_counter()
+    precompute(state)
+    return perf_counter() - start_time
+
+
+#### Backward heuristics #################################################
+
+def get_backward_heuristic(heuristic : Callable[[StateNode], float], initial_state : StateNode) -> Callable[[StateNode], float]:
+    """ Returns a heuristic for searching backward toward the initial state (as bidirectional search does):
+    an estimate of the cost of the cheapest path from the initial state to each state.
+
+    Heuristics can have a "backward" attribute, a function that takes the initial state and returns such a heuristic.
+    Like the heuristic itself, it should never overestimate. Heuristics without one get the zero heuristic.
+    """
+    backward = getattr(heuristic, "backward", None)
+    if backward is None:
+        return zero_heuristic
+    return backward(initial_state)
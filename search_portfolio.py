@@ -0,0 +1,189 @@
+"""
+Portfolio search: race several agent configurations on the same problem, each in its own process.
+By default the first configuration to find a solution wins, and the others are cancelled.
+With --best, all configurations run until they finish (or the deadline), and the cheapest solution wins.
+
+Usage:
+> python search_portfolio.py PROBLEM FILE AGENT [AGENT ...] [--deadline SECS] [--best] [-c CUTOFF] [-o OUT.csv]
+
+where each AGENT is ALG:STRAT:HEURISTIC, for example:
+> python search_portfolio.py slidepuzzle slidepuzzle_files/test_puzzle4x4-50.slidepuzzle graph:astar:Manhattan graph:greedy:Manhattan --deadline 60
+"""
+from __future__ import annotations
+from typing import List, Tuple, Optional, Union, Dict, Any, Sequence
+import argparse
+import queue
+import sys
+from multiprocessing import Process, Event, Queue
+from time import perf_counter
+
+from search_problem import StateNode, Action
+from search_algorithms import ALL_AGENTS, STRATEGIES, get_agent_class, get_agent_strategies
+from search_batch import PROBLEMS, SUCCESS, CANCELLED, UNSOLVABLE, ERROR, solve, load_problem, write_results, error_row, add_agent_arguments, get_agent_kwargs
+
+INF = float('inf')
+
+"""How long (in seconds) cancelled configurations get to report back before they are terminated."""
+GRACE_PERIOD = 1.0
+
+"""How often (in seconds) to check for configurations whose process died without reporting back."""
+POLL_INTERVAL = 0.1
+
+
+def parse_agent_spec(spec : str) -> Tuple[str, str, str]:
+    """ Split an ALG:STRAT:HEURISTIC agent spec into its three names. Raises ValueError if malformed."""
+    parts = spec.split(":", 2)
+    if len(parts) != 3:
+        raise ValueError("agent spec {!r} is not ALG:STRAT:HEURISTIC".format(spec))
+    return parts[0], parts[1], parts[2]
+
+
+def replay_actions(initial_state : StateNode, actions : Sequence[Action]) -> StateNode:
+    """ Rebuild a path's final StateNode by taking the actions in order from the initial state."""
+    state = initial_state
+    for action in actions:
+        state = state.get_next_state(action)
+    return state
+
+
+def portfolio_worker(problem : str, filename : str, index : int, config : Tuple[str, str, str],
+        stop_event : Any, results : Any, search_kwargs : Dict[str, Any]):
+    """ Run one configuration of the portfolio, and put (index, result row, path actions) on the results queue.
+    Only the actions of the path are sent back (not the StateNodes), since they are small and quick to pickle.
+    A row is always put on the queue: if the search raises an exception, its outcome is ERROR.
+    """
+    alg, strat, heur = config
+    row : Dict[str, Any] = {"file": filename, "algorithm": alg, "strategy": strat, "heuristic": heur}
+    actions = None
+    try:
+        solution_state, search_row = solve(load_problem(problem, filename), get_agent_class(alg, strat), PROBLEMS[problem][1][heur],
+                                    stop_event = stop_event, **search_kwargs)
+        row.update(search_row)
+        if solution_state is not None:
+            actions = [s.last_action for s in solution_state.get_path()[1:]]
+    except Exception as e:
+        row.update(error_row(e))
+    results.put((index, row, actions))
+
+
+def run_portfolio(problem : str,
+        filename : str,
+        configs : Sequence[Tuple[str, str, str]],
+        deadline : float = INF,
+        first_wins : bool = True,
+        **search_kwargs
+        ) -> Tuple[Optional[StateNode], Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    """ Race the (algorithm, strategy, heuristic) configs on one problem file, each in its own process.
+
+    If first_wins, the first successful configuration wins and the rest are cancelled.
+    Otherwise, the cheapest solution found by the deadline (or once all configurations finish) wins.
+    Either way, no configuration runs past the deadline.
+
+    Returns the winning solution StateNode and its result row (both None if no configuration succeeded),
+    and the result rows of every configuration, in the order of configs.
+    Configurations that had to be terminated without reporting back get a row with the CANCELLED outcome,
+    and those that raised an exception (or whose process died) get a row with the ERROR outcome.
+    Any keyword arguments are passed along to solve().
+    """
+    stop_event = Event()
+    results : Queue = Queue()
+    processes = [Process(target = portfolio_worker, args = (problem, filename, i, config, stop_event, results, search_kwargs), daemon = True)
+                for i, config in enumerate(configs)]
+    for process in processes:
+        process.start()
+
+    rows : Dict[int, Dict[str, Any]] = {}
+    winner : Optional[Tuple[Dict[str, Any], List[Action]]] = None
+    end_time = perf_counter() + deadline
+    while len(rows) < len(processes) and not (first_wins and winner is not None):
+        remaining = end_time - perf_counter()
+        if remaining <= 0:
+            break
+        try:
+            index, row, actions = results.get(timeout = min(remaining, POLL_INTERVAL))
+        except queue.Empty:
+            # Workers always report back before exiting normally, so one that crashed never will.
+            for i, process in enumerate(processes):
+                if i not in rows and not process.is_alive() and process.exitcode != 0:
+                    alg, strat, heur = configs[i]
+                    rows[i] = {"file": filename, "algorithm": alg, "strategy": strat, "heuristic": heur,
+                                "outcome": ERROR, "error": "worker process exited with code {}".format(process.exitcode)}
+            continue
+        rows[index] = row
+        if row["outcome"] == SUCCESS and (winner is None or row["cost"] < winner[0]["cost"]):
+            winner = (row, actions)
+
+    # Cancel the others, and give them a moment to report back before terminating them.
+    stop_event.set()
+    grace_end_time = perf_counter() + GRACE_PERIOD
+    while len(rows) < len(processes) and perf_counter() < grace_end_time:
+        try:
+            index, row, actions = results.get(timeout = max(grace_end_time - perf_counter(), 0))
+        except queue.Empty:
+            break
+        rows[index] = row
+    for process in processes:
+        process.join(max(grace_end_time - perf_counter(), 0))
+        if process.is_alive():
+            process.terminate()
+            process.join()
+
+    all_rows = []
+    for i, (alg, strat, heur) in enumerate(configs):
+        all_rows.append(rows.get(i, {"file": filename, "algorithm": alg, "strategy": strat, "heuristic": heur, "outcome": CANCELLED}))
+
+    if winner is None:
+        return None, None, all_rows
+    return replay_actions(load_problem(problem, filename), winner[1]), winner[0], all_rows
+
+
+def main(argv : Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description = "Race several goal search agents on one problem file.")
+    parser.add_argument("problem", choices = PROBLEMS.keys(), help = "the problem type of the file")
+    parser.add_argument("file", help = "the problem file to solve")
+    parser.add_argument("agents", nargs = "+", metavar = "AGENT", help = "agent configurations, as ALG:STRAT:HEURISTIC")
+    parser.add_argument("--deadline", type = float, default = INF, help = "seconds before all searches are stopped (default: INF)")
+    parser.add_argument("--best", action = "store_true", help = "return the cheapest solution by the deadline, not the first")
+    parser.add_argument("-c", "--cutoff", type = float, default = INF, help = "length/cost cutoff (default: INF)")
+    parser.add_argument("-o", "--output", default = None, help = "CSV file to write every configuration's results to")
+    add_agent_arguments(parser)
+    args = parser.parse_args(argv)
+
+    configs = []
+    for spec in args.agents:
+        try:
+            alg, strat, heur = parse_agent_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+        if alg not in ALL_AGENTS or strat not in STRATEGIES or heur not in PROBLEMS[args.problem][1]:
+            parser.error("unknown algorithm, strategy or heuristic in {!r}".format(spec))
+        # Standalone agents are reported under the one strategy they are registered with
+        strat = get_agent_strategies(alg, [strat])[0]
+        configs.append((alg, strat, heur))
+
+    solution_state, winner_row, rows = run_portfolio(args.problem, args.file, configs,
+                deadline = args.deadline, first_wins = not args.best, cutoff = args.cutoff, trace_memory = False,
+                agent_kwargs = get_agent_kwargs(args))
+
+    if args.output is not None:
+        with open(args.output, 'w', newline = '') as out:
+            write_results(rows, out)
+
+    for row in rows:
+        if row["outcome"] == ERROR:
+            print("{}:{}:{} failed: {}".format(row["algorithm"], row["strategy"], row["heuristic"], row["error"]), file = sys.stderr)
+
+    if solution_state is None or winner_row is None:
+        if all(row["outcome"] == UNSOLVABLE for row in rows):
+            print("The initial state is unsolvable.")
+        else:
+            print("No configuration found a solution.")
+        sys.exit(1)
+    print("Winner: {}:{}:{} (cost {}, {:.4f} seconds)".format(winner_row["algorithm"], winner_row["strategy"],
+            winner_row["heuristic"], winner_row["cost"], winner_row["wall_time"]))
+    for node in solution_state.get_path()[1:]:
+        print("({}): {} [Cost: {}]".format(node.depth, node.describe_last_action(), node.path_cost))
+
+
+if __name__ == "__main__":
+    main()
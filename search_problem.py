@@ -14,6 +14,8 @@ for all kinds of problems.
 
 class Action(ABC):
     """ An abstract object that represents an action in an environment """
+    __slots__ = ()
+
     def __str__(self) -> str:
         """ Returns a string that describes this action """
         raise NotImplementedError
@@ -37,11 +39,21 @@ class StateNode(ABC):
     that led to this state.
     """
 
+    # __slots__ (instead of a __dict__ per instance) keep each node small; subclasses should declare their own __slots__ too,
+    # and keep any data shared by all states of a problem in one separate object rather than on every node.
+    __slots__ = ("parent", "last_action", "depth", "path_cost", "cached_features", "cached_hash", "heuristic_owner", "heuristic_value")
+
     # Type Hints allow for the optional type declaration of instance variables, like Java
     parent : Optional[StateNode] #type:ignore
     last_action : Optional[Action]
     depth : int
     path_cost : float
+    # get_state_features() and its hash, computed at most once per node (see get_cached_state_features() and __hash__())
+    cached_features : Optional[Hashable]
+    cached_hash : Optional[int]
+    # The value of an incremental heuristic for this node, and the IncrementalHeuristic it belongs to (see search_heuristics)
+    heuristic_owner : Optional[Any]
+    heuristic_value : Optional[float]
 
     @staticmethod
     @abstractmethod
@@ -72,6 +84,10 @@ class StateNode(ABC):
         self.last_action = last_action
         self.depth = depth
         self.path_cost = path_cost
+        self.cached_features = None
+        self.cached_hash = None
+        self.heuristic_owner = None
+        self.heuristic_value = None
 
     @abstractmethod
     def get_state_features(self: SN) -> Hashable:
@@ -86,6 +102,17 @@ class StateNode(ABC):
         """
         raise NotImplementedError
 
+    def get_cached_state_features(self) -> Hashable:
+        """Returns get_state_features(), but only computes it the first time for each StateNode.
+        Since states are immutable, their features never change.
+
+        You do not need to override this method.
+        """
+        features = self.cached_features
+        if features is None:
+            features = self.cached_features = self.get_state_features()
+        return features
+
     @abstractmethod
     def __str__(self) -> str:
         """Return a string representation of the state."""
@@ -106,6 +133,14 @@ class StateNode(ABC):
         """Return all legal actions from this state. Actions may be whatever type you wish."""
         raise NotImplementedError
 
+    def is_solvable(self) -> bool:
+        """Returns False if no goal state can be reached from this state, so there is no point searching from it.
+
+        You do not need to override this method - by default, every state is assumed solvable.
+        Environments with a cheap test (like the slide puzzle's parity) can override it.
+        """
+        return True
+
     def describe_last_action(self) -> str:
         """Returns a string describing the last_action taken (that resulted in transitioning from parent to this state)
         (Can be None or "None" if the initial state)
@@ -124,7 +159,35 @@ class StateNode(ABC):
         -- action is assumed legal (is_legal_action called before), but a ValueError may be passed for illegal actions if desired.
         """
         raise NotImplementedError
-    
+
+    def get_goal_states(self: SN) -> Iterable[SN]:
+        """ Return an initial (root) StateNode for every goal state of this state's environment.
+
+        You only need to override this (and get_previous_states) for environments that bidirectional search
+        should work on, since it searches backwards from the goal states.
+        """
+        raise NotImplementedError("{} does not support searching backwards from its goals".format(type(self).__name__))
+
+    def get_previous_states(self: SN) -> Iterable[SN]:
+        """ Return a StateNode for every state from which one legal action leads to this state, for searching backwards.
+
+        Each new StateNode should have this StateNode (self) as its parent (in the backward search tree),
+        the action that leads *from it to this state* as its last_action, and the cost of that action added to its path_cost.
+        They must be exactly the reverse of get_all_actions()/get_next_state() (including for states that can only be initial states),
+        or bidirectional search may miss solutions.
+        """
+        raise NotImplementedError("{} does not support searching backwards from its goals".format(type(self).__name__))
+
+    def get_jump_points(self: SN) -> Iterable[SN]:
+        """ Return the successors of this state for jump point search: the states where a run of moves in each direction
+        stops being uninteresting (at a goal, or where a turn may be needed by some optimal path), skipping the states in between.
+
+        Each returned StateNode should be the end of a chain of get_next_state() calls from this StateNode (self),
+        so that its path, depth, and path_cost are the same as if every move had been made one at a time.
+        You only need to override this for grid environments that jump point search should work on.
+        """
+        raise NotImplementedError("{} does not support jump point search".format(type(self).__name__))
+
     def get_path(self: SN) -> Sequence[SN]:
         """Returns a sequence (list) of StateNodes representing the path from the initial state to this state.
 
@@ -161,16 +224,26 @@ class StateNode(ABC):
         """
         __eq__ is needed to make StateNode comparable and usable in Sets/Dicts
         This implementation simply checks types and then compares get_state_features().
+        As shortcuts, the same node is always equal to itself, and nodes with different (cached) hashes never are.
 
         You probably want to leave this function alone in subclasses, but
         it could theoretically be overridden to be more efficient.
         """
+        if self is other:
+            return True
         if isinstance(other, type(self)) :
-            return self.get_state_features() == other.get_state_features()
+            return hash(self) == hash(other) and self.get_cached_state_features() == other.get_cached_state_features()
         return False
     
     def __hash__(self) -> int:
         """
         Leave this function alone; it is important to make StateNode hashable and usable in Sets/Dicts.
+        The hash of the state features is computed the first time, and cached.
         """
-        return hash(self.get_state_features())
+        h = self.cached_hash
+        if h is None:
+            features = self.cached_features
+            if features is None:
+                features = self.cached_features = self.get_state_features()
+            h = self.cached_hash = hash(features)
+        return h
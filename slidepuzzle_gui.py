@@ -106,14 +106,17 @@ class SlidePuzzle_GUI(Search_GUI):
 
 
 if __name__ == "__main__":
-    if len(argv) > 1:
-        file_path = argv[1]
+    # With --packed, use the bit-packed state representation (PackedSlidePuzzleState)
+    packed = "--packed" in argv
+    args = [arg for arg in argv[1:] if arg != "--packed"]
+    if len(args) > 0:
+        file_path = args[0]
     else: 
         initroot = Tk()
         initroot.withdraw()
         file_path = filedialog.askopenfilename(title = "Open Slide Puzzle File",initialdir = getcwd(), filetypes=[("SlidePuzzle", ".slidepuzzle"), ("Text", ".txt")])
         initroot.destroy()
-    initial_state = SlidePuzzleState.readFromFile(file_path)
+    initial_state = PackedSlidePuzzleState.readFromFile(file_path) if packed else SlidePuzzleState.readFromFile(file_path)
     gui = SlidePuzzle_GUI(initial_state,algorithm_names=list(ALGORITHMS.keys()), strategy_names=list(STRATEGIES.keys()), heuristics=SLIDEPUZZLE_HEURISTICS)
     controller = Search_GUI_Controller(gui, initial_state, SLIDEPUZZLE_HEURISTICS)
     gui.mainloop()
\ No newline at end of file
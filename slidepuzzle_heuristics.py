@@ -1,5 +1,9 @@
+from functools import lru_cache
+from bisect import bisect_left
+from collections import deque
 from search_heuristics import *
 from slidepuzzle_problem import *
+from slidepuzzle_pdb import PatternDatabaseHeuristic
 
 INF = float('inf')
 
@@ -34,12 +38,196 @@ def slidepuzzle_manhattan(state : SlidePuzzleState)  -> float:
     return score
 
 
+#### Stronger heuristics #################################################
+
+"""
+Linear conflict: if two tiles are both in their goal row (or column), but in the wrong order,
+one of them must leave the row (or column) and come back, which costs 2 more moves than their Manhattan distances.
+For each line, the number of tiles that must leave is the number of its "goal" tiles minus the longest
+increasing subsequence of their goal positions. Each line's value is computed as it is needed and memoized,
+since the same lines come up over and over during a search (a table of every possible line would be too big for 9x9 and up).
+"""
+
+@lru_cache(maxsize = 1 << 16)
+def line_conflicts(goals : Tuple[int, ...]) -> int:
+    """ Given the distinct goal positions of the tiles in a line, in the order they appear,
+    returns the minimum number of those tiles that must leave the line to get the rest in order.
+    """
+    # Longest increasing subsequence, in O(k log k): tails[i] is the smallest last goal of an increasing subsequence of length i+1
+    tails : List[int] = []
+    for goal in goals:
+        i = bisect_left(tails, goal)
+        if i == len(tails):
+            tails.append(goal)
+        else:
+            tails[i] = goal
+    return len(goals) - len(tails)
+
+""" Return the Manhattan distance plus the linear conflicts of the SlidePuzzleState """
+def slidepuzzle_linear_conflict(state : SlidePuzzleState)  -> float:
+    n = state.get_size()
+    tiles = state.tiles
+    distance = 0
+    conflicts = 0
+    for r in range(n):
+        for c, tile in enumerate(tiles[r]):
+            if tile != 0:
+                distance += abs(tile // n - r) + abs(tile % n - c)
+        conflicts += line_conflicts(tuple(tile % n for tile in tiles[r] if tile != 0 and tile // n == r))
+    for c in range(n):
+        conflicts += line_conflicts(tuple(tiles[r][c] // n for r in range(n) if tiles[r][c] != 0 and tiles[r][c] % n == c))
+    return distance + 2 * conflicts
+
+
+"""
+Walking distance: count, for each row, how many of its tiles belong in each goal row (and which row has the empty spot).
+Every vertical move swaps the empty spot with a tile of an adjacent row, changing that table, and no horizontal move changes it.
+The fewest vertical moves needed to reach the goal's table (precomputed by a breadth-first search back from the goal),
+plus the same for columns and horizontal moves, is the walking distance.
+Since the goal is symmetric (tile r*N+c belongs at row r, column c), one table serves for both rows and columns.
+The table has 24964 configurations for 4x4, but millions for 5x5, which takes too long to build in Python;
+bigger puzzles fall back to the Manhattan distance.
+"""
+WALKING_DISTANCE_MAX_SIZE = 4
+
+@lru_cache(maxsize = None)
+def walking_distance_table(n : int) -> Dict[Tuple[Tuple[int, ...], int], int]:
+    """ Maps each (row counts, empty row) configuration of an N-by-N puzzle to its fewest vertical moves from the goal.
+    The row counts are flattened, so counts[r * N + g] is the number of tiles in row r that belong in goal row g.
+    """
+    goal_counts = [0] * (n * n)
+    for tile in range(1, n * n):
+        goal_counts[(tile // n) * n + tile // n] += 1
+    goal = (tuple(goal_counts), 0)
+    table = {goal: 0}
+    frontier = deque([goal])
+    while frontier:
+        config = frontier.popleft()
+        counts, empty_row = config
+        for other_row in (empty_row - 1, empty_row + 1):
+            if not 0 <= other_row < n:
+                continue
+            for g in range(n):
+                if counts[other_row * n + g] > 0:
+                    # A tile that belongs in goal row g moves from the other row into the empty spot's row
+                    new_counts = list(counts)
+                    new_counts[other_row * n + g] -= 1
+                    new_counts[empty_row * n + g] += 1
+                    new_config = (tuple(new_counts), other_row)
+                    if new_config not in table:
+                        table[new_config] = table[config] + 1
+                        frontier.append(new_config)
+    return table
+
+""" Return the walking distance (vertical plus horizontal) of the SlidePuzzleState """
+def slidepuzzle_walking_distance(state : SlidePuzzleState)  -> float:
+    n = state.get_size()
+    if n > WALKING_DISTANCE_MAX_SIZE:
+        return slidepuzzle_manhattan(state)
+    tiles = state.tiles
+    row_counts = [0] * (n * n)
+    col_counts = [0] * (n * n)
+    for r in range(n):
+        for c in range(n):
+            tile = tiles[r][c]
+            if tile != 0:
+                row_counts[r * n + tile // n] += 1
+                col_counts[c * n + tile % n] += 1
+    empty = state.get_empty_pos()
+    table = walking_distance_table(n)
+    return table[(tuple(row_counts), empty.row)] + table[(tuple(col_counts), empty.col)]
+
+
+#### Incremental evaluation #################################################
+
+"""
+A move only changes the position of one tile, so the heuristics above can be updated from the parent's value
+with a precomputed table of how much each tile's contribution changes, indexed by (tile, from cell, to cell).
+Cells are numbered in row-major order. The delta functions are attached to the heuristics as their "delta" attribute,
+which the agents use automatically (see IncrementalHeuristic).
+"""
+
+@lru_cache(maxsize = None)
+def hamming_delta_table(n : int) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """ The change in Hamming distance when each tile moves from one cell to another, for an N-by-N puzzle. """
+    return tuple(tuple(tuple( 0 if tile == 0 else int(tile != to_cell) - int(tile != from_cell)
+                            for to_cell in range(n * n)) for from_cell in range(n * n)) for tile in range(n * n))
+
+@lru_cache(maxsize = None)
+def manhattan_delta_table(n : int) -> Tuple[Tuple[Tuple[int, ...], ...], ...]:
+    """ The change in Manhattan distance when each tile moves from one cell to another, for an N-by-N puzzle. """
+    def distance(tile : int, cell : int) -> int:
+        return abs(tile // n - cell // n) + abs(tile % n - cell % n)
+    return tuple(tuple(tuple( 0 if tile == 0 else distance(tile, to_cell) - distance(tile, from_cell)
+                            for to_cell in range(n * n)) for from_cell in range(n * n)) for tile in range(n * n))
+
+def get_last_move(state : SlidePuzzleState) -> Tuple[int, int, int]:
+    """ Returns the (tile, from cell, to cell) of the last move, which took the parent to this (non-root) state.
+    The tile moved from the last_action's position to the parent's empty spot.
+    """
+    n = state.get_size()
+    from_pos = state.last_action
+    to_pos = state.parent.get_empty_pos()
+    return state.get_tile_at(to_pos), from_pos.row * n + from_pos.col, to_pos.row * n + to_pos.col
+
+def slidepuzzle_hamming_delta(state : SlidePuzzleState) -> float:
+    """ Returns the change in Hamming distance from the parent's to this (non-root) state. """
+    tile, from_cell, to_cell = get_last_move(state)
+    return hamming_delta_table(state.get_size())[tile][from_cell][to_cell]
+
+def slidepuzzle_manhattan_delta(state : SlidePuzzleState) -> float:
+    """ Returns the change in Manhattan distance from the parent's to this (non-root) state. """
+    tile, from_cell, to_cell = get_last_move(state)
+    return manhattan_delta_table(state.get_size())[tile][from_cell][to_cell]
+
+slidepuzzle_hamming.delta = slidepuzzle_hamming_delta # type: ignore
+slidepuzzle_manhattan.delta = slidepuzzle_manhattan_delta # type: ignore
+
+
+# Puzzle sizes without a pattern database file (see slidepuzzle_pdb.py) fall back to the linear conflict heuristic
+slidepuzzle_pattern_database = PatternDatabaseHeuristic(fallback = slidepuzzle_linear_conflict)
+
+
+#### Backward heuristics #################################################
+
+"""
+For searching backward toward the initial state (see search_heuristics.get_backward_heuristic),
+the stronger heuristics are all tied to the goal's layout, so they all use the Manhattan distance from the initial state instead.
+"""
+
+def slidepuzzle_manhattan_backward(initial_state : SlidePuzzleState) -> Callable[[SlidePuzzleState], float]:
+    """ Returns the heuristic of the sum of Manhattan distances between tiles and their positions in the initial state. """
+    n = initial_state.get_size()
+    start_rows = [0] * (n * n)
+    start_cols = [0] * (n * n)
+    for r, row in enumerate(initial_state.tiles):
+        for c, tile in enumerate(row):
+            start_rows[tile] = r
+            start_cols[tile] = c
+    def slidepuzzle_manhattan_from_start(state : SlidePuzzleState) -> float:
+        score = 0
+        for r, row in enumerate(state.tiles):
+            for c, tile in enumerate(row):
+                if tile != 0:
+                    score += abs(start_rows[tile] - r) + abs(start_cols[tile] - c)
+        return score
+    return slidepuzzle_manhattan_from_start
+
+slidepuzzle_manhattan.backward = slidepuzzle_manhattan_backward # type: ignore
+slidepuzzle_linear_conflict.backward = slidepuzzle_manhattan_backward # type: ignore
+slidepuzzle_walking_distance.backward = slidepuzzle_manhattan_backward # type: ignore
+slidepuzzle_pattern_database.backward = slidepuzzle_manhattan_backward # type: ignore
+
+
 # This is a named list of heuristics for the Roomba problem.
 # Add any more that you wish to use in the GUI
 SLIDEPUZZLE_HEURISTICS = {
     "Zero" : zero_heuristic, 
     "Arbitrary": arbitrary_heuristic, 
     "Hamming" : slidepuzzle_hamming,
-    "Manhattan" : slidepuzzle_manhattan
+    "Manhattan" : slidepuzzle_manhattan,
+    "Linear Conflict" : slidepuzzle_linear_conflict,
+    "Walking Distance" : slidepuzzle_walking_distance,
+    "Pattern Database" : slidepuzzle_pattern_database,
     }
 
@@ -0,0 +1,249 @@
+"""
+Additive pattern databases for the slide puzzle.
+
+The tiles are split into disjoint groups (patterns). For each pattern, a table holds the fewest moves *of that pattern's tiles*
+needed to get them from any placement into their goal cells (other tiles are treated as indistinguishable, and moving them is free).
+Since no move is counted by more than one pattern, the sum of the patterns' values is an admissible heuristic.
+
+The tables are built once by a breadth-first search back from the goal (see SlidePuzzleState.is_goal_state),
+saved to a compact binary file (one byte per placement of each pattern's tiles), and loaded with mmap,
+so loading is instant and processes reading the same file share its memory.
+
+Usage:
+> python slidepuzzle_pdb.py N [-p TILES [-p TILES ...]] [-o FILE]
+
+For example, to build the default 5-5-5 database for 4x4 puzzles (which takes a minute or two):
+> python slidepuzzle_pdb.py 4
+or a 6-6-3 one (which takes much longer):
+> python slidepuzzle_pdb.py 4 -p 1,2,3,4,5,6 -p 7,8,9,10,11,12 -p 13,14,15
+"""
+from __future__ import annotations
+from typing import List, Tuple, Optional, Dict, Sequence, Callable
+import argparse
+import mmap
+import os
+import struct
+import warnings
+from array import array
+
+from slidepuzzle_problem import SlidePuzzleState
+
+""" Where pattern databases are saved and loaded from, by default (N is the puzzle size). """
+PDB_FILE_FORMAT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "slidepuzzle_files", "{0}x{0}.pdb")
+
+""" The default partitions of the tiles into patterns, for each puzzle size """
+DEFAULT_PATTERNS : Dict[int, Tuple[Tuple[int, ...], ...]] = {
+    2: ((1, 2, 3),),
+    3: ((1, 2, 3, 4), (5, 6, 7, 8)),
+    4: ((1, 2, 3, 4, 5), (6, 7, 8, 9, 10), (11, 12, 13, 14, 15)),
+    5: ((1, 2, 5, 6, 7), (3, 4, 8, 9, 14), (10, 11, 15, 16, 20), (12, 13, 17, 18, 19), (21, 22, 23, 24)),
+}
+
+""" The file starts with MAGIC, then the puzzle size and the number of patterns, then each pattern's number of tiles and tiles,
+all as unsigned bytes. Then come the tables, one after the other, in the same order. """
+MAGIC = b"SPDB1\0"
+
+UNSEEN = 255
+
+""" The (row, column) offsets of the cells next to a cell. Not imported from slidepuzzle_problem,
+since the assignment starter version of it doesn't have them. """
+ADJACENT_OFFSETS : Tuple[Tuple[int, int], ...] = ((0, 1), (-1, 0), (0, -1), (1, 0))
+
+
+def count_placements(cells : int, k : int) -> int:
+    """ The number of ways to place k distinct tiles in distinct cells (of the given number of cells). """
+    count = 1
+    for i in range(k):
+        count *= cells - i
+    return count
+
+def rank_placement(positions : Sequence[int], cells : int) -> int:
+    """ Returns the index (0 to count_placements - 1) of a placement of tiles, given as the cell of each tile in order.
+    Each tile's cell is numbered among only the cells not taken by earlier tiles.
+    """
+    index = 0
+    for i, p in enumerate(positions):
+        smaller = 0
+        for j in range(i):
+            if positions[j] < p:
+                smaller += 1
+        index = index * (cells - i) + p - smaller
+    return index
+
+def unrank_placement(index : int, k : int, cells : int) -> Tuple[int, ...]:
+    """ The inverse of rank_placement: returns the cell of each of the k tiles of the placement with that index."""
+    digits = [0] * k
+    for i in range(k - 1, -1, -1):
+        index, digits[i] = divmod(index, cells - i)
+    free = list(range(cells))
+    return tuple(free.pop(d) for d in digits)
+
+
+def build_pattern_table(n : int, pattern : Sequence[int]) -> bytearray:
+    """ Returns the table of the fewest moves of the pattern's tiles from each placement of them (by rank_placement)
+    to the goal, for an N-by-N puzzle.
+
+    This is a breadth-first search back from the goal over (placement, empty cell) states, in layers by number of pattern moves.
+    Within a layer, the empty spot wanders freely (depth-first) across the cells of other tiles, which costs nothing.
+    """
+    cells = n * n
+    k = len(pattern)
+    neighbors = [tuple((r + dr) * n + c + dc for dr, dc in ADJACENT_OFFSETS if 0 <= r + dr < n and 0 <= c + dc < n)
+                 for r, c in (divmod(i, n) for i in range(cells))]
+    table = bytearray([UNSEEN]) * count_placements(cells, k)
+    seen = bytearray(len(table) * cells) # by placement index * cells + empty cell
+    # In the goal, each tile is at the cell of its own number, and the empty spot is at cell 0
+    layer = array('q', [rank_placement(pattern, cells) * cells])
+    moves = 0
+    while layer:
+        next_layer = array('q')
+        while layer:
+            key = layer.pop()
+            if seen[key]:
+                continue
+            seen[key] = 1
+            index, empty = divmod(key, cells)
+            if table[index] == UNSEEN:
+                table[index] = moves
+            positions = unrank_placement(index, k, cells)
+            for cell in neighbors[empty]:
+                if cell in positions:
+                    # A pattern tile slides into the empty spot: one move
+                    i = positions.index(cell)
+                    new_key = rank_placement(positions[:i] + (empty,) + positions[i+1:], cells) * cells + cell
+                    if not seen[new_key]:
+                        next_layer.append(new_key)
+                else:
+                    # Another tile slides into the empty spot: free
+                    new_key = index * cells + cell
+                    if not seen[new_key]:
+                        layer.append(new_key)
+        layer = next_layer
+        moves += 1
+    return table
+
+
+def save_pattern_database(filename : str, n : int, patterns : Sequence[Sequence[int]], tables : Sequence[bytearray]):
+    """ Write the patterns and their tables to a pattern database file. """
+    with open(filename, 'wb') as file:
+        file.write(MAGIC)
+        file.write(struct.pack("BB", n, len(patterns)))
+        for pattern in patterns:
+            file.write(struct.pack("B", len(pattern)))
+            file.write(bytes(pattern))
+        for table in tables:
+            file.write(table)
+
+
+class PatternDatabase:
+    """ A loaded (memory-mapped) additive pattern database for N-by-N puzzles. """
+    size : int
+    patterns : Tuple[Tuple[int, ...], ...]
+    tables : Tuple[memoryview, ...]
+    data : mmap.mmap
+
+    def __init__(self, filename : str):
+        with open(filename, 'rb') as file:
+            self.data = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ)
+        if self.data[:len(MAGIC)] != MAGIC:
+            raise ValueError("{} is not a slide puzzle pattern database".format(filename))
+        offset = len(MAGIC)
+        self.size, count = struct.unpack_from("BB", self.data, offset)
+        offset += 2
+        patterns = []
+        for i in range(count):
+            k = self.data[offset]
+            patterns.append(tuple(self.data[offset + 1 : offset + 1 + k]))
+            offset += 1 + k
+        self.patterns = tuple(patterns)
+        view = memoryview(self.data)
+        tables = []
+        for pattern in self.patterns:
+            length = count_placements(self.size * self.size, len(pattern))
+            tables.append(view[offset : offset + length])
+            offset += length
+        self.tables = tuple(tables)
+
+    def get_value(self, state : SlidePuzzleState) -> int:
+        """ The sum of the patterns' values for the state. """
+        n = self.size
+        cells = n * n
+        positions = [0] * cells
+        for r, row in enumerate(state.tiles):
+            for c, tile in enumerate(row):
+                positions[tile] = r * n + c
+        return sum(table[rank_placement([positions[tile] for tile in pattern], cells)]
+                    for pattern, table in zip(self.patterns, self.tables))
+
+
+class PatternDatabaseHeuristic:
+    """ A heuristic function that looks states up in the pattern database for their size,
+    loading it from the file given by PDB_FILE_FORMAT the first time each size is needed.
+
+    If there is no database file for a size, it warns (once per size) and uses the fallback heuristic for states of that size instead,
+    or raises FileNotFoundError if it has no fallback.
+    """
+    databases : Dict[int, Optional[PatternDatabase]] # None for sizes with no database file
+    fallback : Optional[Callable[[SlidePuzzleState], float]]
+
+    def __init__(self, fallback : Optional[Callable[[SlidePuzzleState], float]] = None):
+        self.databases = {}
+        self.fallback = fallback
+
+    def get_database(self, n : int) -> Optional[PatternDatabase]:
+        """ The pattern database for N-by-N puzzles, or None if there is no file for it (and there is a fallback)."""
+        if n not in self.databases:
+            filename = PDB_FILE_FORMAT.format(n)
+            if os.path.exists(filename):
+                self.databases[n] = PatternDatabase(filename)
+            else:
+                message = "No pattern database for {0}x{0} slide puzzles at {1}".format(n, filename)
+                if n in DEFAULT_PATTERNS:
+                    message += "; build one with: python slidepuzzle_pdb.py {}".format(n)
+                if self.fallback is None:
+                    raise FileNotFoundError(message)
+                warnings.warn("{} (using {} instead)".format(message, getattr(self.fallback, "__name__", "the fallback heuristic")))
+                self.databases[n] = None
+        return self.databases[n]
+
+    def precompute(self, state : SlidePuzzleState):
+        """ Load the pattern database for the state's size ahead of the search (see search_heuristics.precompute_heuristic)."""
+        self.get_database(state.get_size())
+
+    def __call__(self, state : SlidePuzzleState) -> float:
+        database = self.get_database(state.get_size())
+        if database is None:
+            return self.fallback(state) # type: ignore
+        return database.get_value(state)
+
+
+def parse_pattern(text : str) -> Tuple[int, ...]:
+    return tuple(int(x) for x in text.split(","))
+
+def main(argv : Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description = "Build an additive pattern database for N-by-N slide puzzles.")
+    parser.add_argument("size", type = int, help = "the puzzle size N")
+    parser.add_argument("-p", "--pattern", type = parse_pattern, action = "append", metavar = "TILES",
+                        help = "comma-separated tiles of one pattern; repeat for each pattern (default: see DEFAULT_PATTERNS)")
+    parser.add_argument("-o", "--output", default = None, help = "file to save to (default: {})".format(PDB_FILE_FORMAT.format("N")))
+    args = parser.parse_args(argv)
+
+    n = args.size
+    patterns = args.pattern if args.pattern is not None else DEFAULT_PATTERNS.get(n)
+    if patterns is None:
+        parser.error("no default patterns for size {}; give them with -p".format(n))
+    tiles = [tile for pattern in patterns for tile in pattern]
+    if len(tiles) != len(set(tiles)) or not all(0 < tile < n * n for tile in tiles):
+        parser.error("patterns must be disjoint sets of tiles from 1 to {}".format(n * n - 1))
+
+    tables = []
+    for pattern in patterns:
+        print("Building pattern {} ({} placements)...".format(",".join(str(t) for t in pattern), count_placements(n * n, len(pattern))))
+        tables.append(build_pattern_table(n, pattern))
+    filename = args.output if args.output is not None else PDB_FILE_FORMAT.format(n)
+    save_pattern_database(filename, n, patterns, tables)
+    print("Saved to {}".format(filename))
+
+
+if __name__ == "__main__":
+    main()
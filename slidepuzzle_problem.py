@@ -12,6 +12,7 @@ class Coordinate:
     """ Represents a specific location on the grid with given row and col(umn)
     The first row and column are numbered 0.
     """
+    __slots__ = ("row", "col")
     row : int
     col : int
     def __init__(self, row : int, col : int):
@@ -44,7 +45,7 @@ class SlidePuzzleAction(Coordinate, Action):
 
     Subclass of both Coordinate and Action
     """
-    pass
+    __slots__ = ()
 
 
 ALL_ADJACENT : Tuple[Tuple[int,int],...]= ((0,1), (-1,0), (0,-1), (1,0))
@@ -52,6 +53,7 @@ class SlidePuzzleState(StateNode):
     """ A state node for the slide puzzle environment. """
 
     # Type Hints allow for the optional type declaration of "instance variables" this way, like Java.
+    __slots__ = ("tiles", "empty_pos")
     tiles : Tuple[Tuple[int, ...], ...]
     empty_pos : Coordinate
     # These are already mentioned in the StateNode superclass, but more specifically typed here
@@ -162,6 +164,32 @@ class SlidePuzzleState(StateNode):
                 i += 1
         return True
 
+    # Override
+    def is_solvable(self) -> bool:
+        """Returns whether the goal can be reached, by parity, in O(N^2) time.
+
+        Every move swaps the empty spot with a tile, which flips the parity of the permutation of the board
+        (as a permutation of the cells, including the empty spot), and also flips the parity of the empty spot's
+        distance (rows + columns) from its goal position in the corner. Both are even at the goal,
+        so they must match for the goal to be reachable. The permutation's parity is found from its cycles.
+        """
+        n = self.get_size()
+        flat = [tile for row in self.tiles for tile in row]
+        visited = [False] * (n * n)
+        swaps = 0
+        for start in range(n * n):
+            if visited[start]:
+                continue
+            # A cycle of length k takes k - 1 swaps
+            cell = flat[start]
+            visited[start] = True
+            while cell != start:
+                visited[cell] = True
+                cell = flat[cell]
+                swaps += 1
+        empty = self.get_empty_pos()
+        return swaps % 2 == (empty.row + empty.col) % 2
+
     # Override
     def is_legal_action(self, action : SlidePuzzleAction) -> bool:
         """Returns whether an action is legal from the current state
@@ -216,10 +244,207 @@ class SlidePuzzleState(StateNode):
                         path_cost = self.path_cost + 1,
                         )
 
+    # Override
+    def get_goal_states(self) -> Iterable[SlidePuzzleState]:
+        """Returns the one goal state: tiles in order, with the empty spot in the corner."""
+        n = self.get_size()
+        yield SlidePuzzleState(tiles = tuple(tuple(r * n + c for c in range(n)) for r in range(n)),
+                                empty_pos = Coordinate(0, 0),
+                                parent = None,
+                                last_action = None,
+                                depth = 0,
+                                path_cost = 0)
+
+    # Override
+    def get_previous_states(self) -> Iterable[SlidePuzzleState]:
+        """Returns the states that lead to this one. Every move can be undone by moving the same tile back
+        (into the cell that is empty here), so these are just the next states, with that as their last_action.
+        """
+        back = SlidePuzzleAction(self.empty_pos.row, self.empty_pos.col)
+        for action in self.get_all_actions():
+            state = self.get_next_state(action)
+            state.last_action = back
+            yield state
+
     """ You may add additional methods that may be useful! """
 
     def is_inbounds(self, coord : Coordinate) -> bool:
         return (coord.row >= 0) and (coord.col  >= 0) and (coord.row <self.get_size()) and (coord.col  < self.get_size())
 
     def get_tile_final_dest(self, tile : int) -> Coordinate:
-        return Coordinate(tile // self.get_size(), tile % self.get_size())
\ No newline at end of file
+        return Coordinate(tile // self.get_size(), tile % self.get_size())
+
+class PackedLayout:
+    """ Precomputed tables for bit-packing N-by-N slide puzzle boards into a single integer,
+    shared by all the PackedSlidePuzzleStates of that size.
+
+    The tile at cell i (numbered in row-major order) is kept in bits [i * bits, (i+1) * bits) of the board,
+    where bits is just enough to hold the largest tile number (4 bits for up to 4x4, 5 bits for 5x5).
+    """
+    __slots__ = ("size", "bits", "mask", "shifts", "cells", "neighbors", "goal_board")
+    size : int
+    bits : int
+    mask : int
+    shifts : Tuple[int, ...]
+    cells : Tuple[SlidePuzzleAction, ...]
+    neighbors : Tuple[Tuple[int, ...], ...]
+    goal_board : int
+
+    def __init__(self, size : int):
+        n = size
+        self.size = n
+        self.bits = max((n * n - 1).bit_length(), 1)
+        self.mask = (1 << self.bits) - 1
+        # The bit offset of each cell
+        self.shifts = tuple(i * self.bits for i in range(n * n))
+        # A shared Coordinate (SlidePuzzleAction) for each cell, so moves don't need to create any
+        self.cells = tuple(SlidePuzzleAction(i // n, i % n) for i in range(n * n))
+        # The cells adjacent to each cell, i.e. the tiles that can move when the empty spot is there
+        self.neighbors = tuple(tuple((r + dr) * n + (c + dc) for dr, dc in ALL_ADJACENT if 0 <= r + dr < n and 0 <= c + dc < n)
+                                for r, c in ((i // n, i % n) for i in range(n * n)))
+        # The goal has tile i at cell i
+        self.goal_board = sum(i << self.shifts[i] for i in range(n * n))
+
+    def pack(self, tiles : Tuple[Tuple[int, ...], ...]) -> int:
+        """ Returns the board integer of a tuple grid of tiles. """
+        return sum(tile << self.shifts[i] for i, tile in enumerate(x for row in tiles for x in row))
+
+    def unpack(self, board : int) -> Tuple[Tuple[int, ...], ...]:
+        """ Returns the tuple grid of tiles of a board integer. """
+        n = self.size
+        return tuple(tuple((board >> self.shifts[r * n + c]) & self.mask for c in range(n)) for r in range(n))
+
+
+PACKED_LAYOUTS : Dict[int, PackedLayout] = {}
+
+def get_packed_layout(size : int) -> PackedLayout:
+    """ Returns the (shared) PackedLayout for puzzles of the given size, creating it the first time."""
+    layout = PACKED_LAYOUTS.get(size)
+    if layout is None:
+        layout = PACKED_LAYOUTS[size] = PackedLayout(size)
+    return layout
+
+
+class PackedSlidePuzzleState(StateNode):
+    """ A slide puzzle state node whose tiles are bit-packed into a single integer (see PackedLayout).
+
+    Generating a move is a few shifts and masks rather than rebuilding the grid, the goal test is an integer comparison,
+    and the state features are just the integer. Otherwise, it has the same methods as a SlidePuzzleState
+    (tiles is computed from the board when it is needed), so the agents, heuristics and GUI can all use it.
+    """
+    __slots__ = ("board", "empty_pos", "layout")
+    board : int
+    empty_pos : Coordinate
+    layout : PackedLayout
+    # These are already mentioned in the StateNode superclass, but more specifically typed here
+    parent : Optional[PackedSlidePuzzleState]
+    last_action : Optional[SlidePuzzleAction]
+
+    @staticmethod
+    def readFromFile(filename : str) -> PackedSlidePuzzleState:
+        """Reads data from a text file (in the same format as for SlidePuzzleState) and returns a PackedSlidePuzzleState 
+        which is an initial state.
+        """
+        return PackedSlidePuzzleState.from_state(SlidePuzzleState.readFromFile(filename))
+
+    @staticmethod
+    def from_state(state : SlidePuzzleState) -> PackedSlidePuzzleState:
+        """ Returns a PackedSlidePuzzleState for the same state (and path information) as the SlidePuzzleState. """
+        layout = get_packed_layout(state.get_size())
+        empty = state.get_empty_pos()
+        return PackedSlidePuzzleState(board = layout.pack(state.tiles),
+                                    empty_pos = layout.cells[empty.row * layout.size + empty.col],
+                                    layout = layout,
+                                    parent = None,
+                                    last_action = state.last_action,
+                                    depth = state.depth,
+                                    path_cost = state.path_cost)
+
+    #Override
+    def __init__(self, 
+            board : int,
+            empty_pos : Coordinate,
+            layout : PackedLayout,
+            parent : Optional[PackedSlidePuzzleState], 
+            last_action: Optional[SlidePuzzleAction], 
+            depth : int, 
+            path_cost : float = 0.0) :
+        """Creates a PackedSlidePuzzleState.
+
+        Keyword Arguments:
+        All the arguments for StateNode's __init__.
+        board -- the bit-packed tiles (see PackedLayout)
+        empty_pos -- a coordinate indicating the position of the empty spot (tile 0)
+        layout -- the PackedLayout for this size of puzzle
+        """
+        super().__init__(parent = parent, last_action = last_action, depth = depth, path_cost = path_cost)
+        self.board = board
+        self.empty_pos = empty_pos
+        self.layout = layout
+
+    @property
+    def tiles(self) -> Tuple[Tuple[int, ...], ...]: # type: ignore
+        """ The tuple grid of tiles, unpacked from the board. """
+        return self.layout.unpack(self.board)
+
+    """ Accessor methods, as for SlidePuzzleState """
+
+    def get_size(self) -> int:
+        return self.layout.size
+
+    def get_tile_at(self, coord : Coordinate) -> int:
+        return (self.board >> self.layout.shifts[coord.row * self.layout.size + coord.col]) & self.layout.mask
+
+    # These work just the same as for a SlidePuzzleState
+    get_empty_pos = SlidePuzzleState.get_empty_pos
+    is_inbounds = SlidePuzzleState.is_inbounds
+    get_tile_final_dest = SlidePuzzleState.get_tile_final_dest
+    __str__ = SlidePuzzleState.__str__
+    is_legal_action = SlidePuzzleState.is_legal_action
+    is_solvable = SlidePuzzleState.is_solvable
+    get_previous_states = SlidePuzzleState.get_previous_states
+    describe_last_action = SlidePuzzleState.describe_last_action
+
+    """ Overridden methods from StateNode """
+
+    # Override
+    def get_state_features(self) -> Hashable:
+        """Returns a full featured representation of the state: the packed board integer."""
+        return self.board
+
+    # Override
+    def is_goal_state(self) -> bool:
+        return self.board == self.layout.goal_board
+
+    # Override
+    def get_goal_states(self) -> Iterable[PackedSlidePuzzleState]:
+        layout = self.layout
+        yield PackedSlidePuzzleState(board = layout.goal_board, empty_pos = layout.cells[0], layout = layout,
+                                    parent = None, last_action = None, depth = 0, path_cost = 0)
+
+    # Override
+    def get_all_actions(self) -> Iterable[SlidePuzzleAction]:
+        """Return all legal actions at this state."""
+        layout = self.layout
+        cells = layout.cells
+        for i in layout.neighbors[self.empty_pos.row * layout.size + self.empty_pos.col]:
+            yield cells[i]
+
+    # Override
+    def get_next_state(self, action : SlidePuzzleAction) -> PackedSlidePuzzleState:
+        """ Return a new PackedSlidePuzzleState that results from moving the tile at action into the empty spot.
+        The tile's bits are cleared from its cell and set at the empty cell (which holds 0).
+        """
+        layout = self.layout
+        moved = action.row * layout.size + action.col
+        shift = layout.shifts[moved]
+        tile = (self.board >> shift) & layout.mask
+        return PackedSlidePuzzleState(
+                        board = self.board - (tile << shift) + (tile << layout.shifts[self.empty_pos.row * layout.size + self.empty_pos.col]),
+                        empty_pos = layout.cells[moved],
+                        layout = layout,
+                        parent = self,
+                        last_action = action,
+                        depth = self.depth + 1,
+                        path_cost = self.path_cost + 1,
+                        )
@@ -4,7 +4,7 @@ from spotlessroomba_problem import *
 def roomba_remaining_count(state : SpotlessRoombaState)  -> float:
     # TODO
     # Admissible and consistent
-    return len(state.dirty_locations)
+    return state.count_dirty()
 
 def roomba_distance_to_closest(state : SpotlessRoombaState)  -> float:
     # TODO
@@ -7,14 +7,52 @@ from roomba_problem import *
 DIRTY_TERRAIN = {FLOOR : DIRTY_FLOOR, CARPET : DIRTY_CARPET}
 CLEAN_TERRAIN = {DIRTY_FLOOR : FLOOR, DIRTY_CARPET : CARPET}
 
+class SpotlessRoombaProblem(RoombaProblem):
+    """
+    The data of a Spotless Roomba environment that is the same for every state: the (clean) grid of terrain,
+    and the dirty spots of the maze as it was read, numbered in order (dirty_cells and dirty_coords).
+    Dirty spot i is bit i (1 << i) of a state's dirty_mask, and dirty_bits gives the bit of each cell (0 if it isn't a dirty spot),
+    so checking or cleaning the dirty spot of a cell is a single lookup.
+    dirty_locations gives the Coordinates of the dirty spots still dirty for each dirty_mask, decoded the first time a state needs them
+    (many states share the same dirty_mask, so each is only decoded once).
+    """
+    __slots__ = ("dirty_bits", "dirty_locations")
+    dirty_bits : Tuple[int, ...]
+    dirty_locations : Dict[int, Tuple[Coordinate, ...]]
+
+    def __init__(self, grid : Tuple[Tuple[Terrain,...],...], dirty_cells : Sequence[int]):
+        """
+        Keyword Arguments:
+        grid: 2-d Tuple grid of (clean) Terrains, representing the maze.
+        dirty_cells: the cell index of each dirty spot.
+        """
+        super().__init__(grid)
+        self.dirty_cells = tuple(dirty_cells)
+        self.dirty_coords = tuple(self.coords[cell] for cell in self.dirty_cells)
+        dirty_bits = [0] * len(self.terrain)
+        for i, cell in enumerate(self.dirty_cells):
+            dirty_bits[cell] = 1 << i
+        self.dirty_bits = tuple(dirty_bits)
+        self.dirty_locations = {}
+
+    def get_dirty_locations(self, dirty_mask : int) -> Tuple[Coordinate, ...]:
+        """ The (shared) Coordinates of the dirty spots whose bits are set in the dirty_mask, in order."""
+        locations = self.dirty_locations.get(dirty_mask)
+        if locations is None:
+            locations = self.dirty_locations[dirty_mask] = tuple(coord for i, coord in enumerate(self.dirty_coords) if dirty_mask >> i & 1)
+        return locations
+
+
 class SpotlessRoombaState(RoombaState):
     """
     A subclass of RoombaState. The main difference is that the roomba agent's goal is to 
     reach (and clean) ALL the dirty spots, not just one of them.
     """
 
-    dirty_locations : Tuple[Coordinate,...]
+    __slots__ = ("dirty_mask",)
+    dirty_mask : int # Bit i is set if dirty spot i (see SpotlessRoombaProblem) is still dirty
     # These are already mentioned in the superclasses, but more specifically typed here
+    problem : SpotlessRoombaProblem
     parent : Optional[SpotlessRoombaState]
      
     #Overridden
@@ -37,21 +75,22 @@ class SpotlessRoombaState(RoombaState):
             # Once again, the grid itself is effectively the same for each state, 
             # except now we must keep track of which dirty spots have been cleaned or not yet.
             # Instead of updating the grid from state to state, 
-            # we will instead keep a list (tuple) of which of the locations are still dirty. 
+            # we will instead number the dirty spots, and keep a bitmask (an int) of which of them are still dirty. 
             # This makes tracking the differences between states easier, faster, 
             # and more memory efficient, among other advantages.
-            dirty : List[Coordinate] = []
+            dirty : List[int] = []
             for i in range(len(grid)):
                 for j in range(len(grid[i])):
                     if grid[i][j] in (DIRTY_CARPET, DIRTY_FLOOR):
-                        dirty.append(Coordinate(i,j))
+                        dirty.append(i * max_c + j)
 
             # Now re-do the grid with the dirty spots changed to their clean counterparts
             grid = tuple( tuple(CLEAN_TERRAIN.get(Terrain(x), Terrain(x)) for x in row) for row in grid)
 
-            return SpotlessRoombaState(dirty_locations = tuple(dirty),
-                                position = Coordinate(init_r, init_c),
-                                grid = grid,
+            problem = SpotlessRoombaProblem(grid, dirty)
+            return SpotlessRoombaState(dirty_mask = (1 << len(dirty)) - 1,
+                                cell = problem.get_cell(Coordinate(init_r, init_c)),
+                                problem = problem,
                                 parent = None,
                                 last_action = None,
                                 depth = 0,
@@ -59,9 +98,9 @@ class SpotlessRoombaState(RoombaState):
 
 
     def __init__(self, 
-                dirty_locations : Tuple[Coordinate,...],
-                position: Coordinate, 
-                grid: Tuple[Tuple[Terrain,...],...], 
+                dirty_mask : int,
+                cell: int, 
+                problem: SpotlessRoombaProblem, 
                 parent : Optional[SpotlessRoombaState], 
                 last_action: Optional[RoombaAction],  #Note that actions are (relative) Coordinates!
                 depth : int, 
@@ -70,19 +109,27 @@ class SpotlessRoombaState(RoombaState):
         Creates a SpotlessRoombaState, which represents a state of the roomba's environment .
 
         Keyword Arguments (in addition to RoombaState arguments):
-        dirty_locations -- A tuple of all the not-yet cleaned (visited) locations that are (still) dirty in the grid. 
+        dirty_mask -- A bitmask of the not-yet cleaned (visited) spots that are (still) dirty in the grid (bit i for the problem's dirty spot i). 
         """
-        super().__init__(position = position, grid = grid, parent = parent, last_action = last_action, depth = depth, path_cost = path_cost)
-        self.dirty_locations = dirty_locations
+        super().__init__(cell = cell, problem = problem, parent = parent, last_action = last_action, depth = depth, path_cost = path_cost)
+        self.dirty_mask = dirty_mask
         
+    @property
+    def dirty_locations(self) -> Tuple[Coordinate,...]:
+        """A tuple of the (shared) Coordinates of all the locations that are still dirty, in order"""
+        return self.problem.get_dirty_locations(self.dirty_mask)
+
+    def count_dirty(self) -> int:
+        """The number of locations that are still dirty"""
+        return bin(self.dirty_mask).count("1")
 
 
     """ Overridden methods from RoombaState and StateNode """
     
     # Override   
     def get_terrain(self, coord : Coordinate) -> Terrain:
-        terrain = self.grid[coord.row][coord.col]
-        return DIRTY_TERRAIN[terrain] if coord in self.dirty_locations else terrain 
+        terrain = self.problem.grid[coord.row][coord.col]
+        return DIRTY_TERRAIN[terrain] if self.dirty_mask & self.problem.dirty_bits[self.problem.get_cell(coord)] else terrain 
 
 
     # Override
@@ -92,14 +139,14 @@ class SpotlessRoombaState(RoombaState):
         Once again, the grid  is essentially the same for each state, except we must 
         keep track of which dirty spots have been cleaned or not yet.
 
-        Therefore, we'll use dirty_locations as a feature (plus roomba agent position), since it captures the 
-        difference between two states sufficiently. Note that this is far more time and memory efficient 
+        Therefore, we'll use the dirty_mask as a feature (plus roomba agent position, as its cell index), since it captures the 
+        difference between two states sufficiently. Both are ints, so the features are small and quick to hash. Note that this is far more time and memory efficient 
         than using the whole grid as a feature, which must be updated for each state.
 
         If two SpotlessRoombaStateNode objects represent the same state, get_features() should return the same for both objects.
         Note, however, that two states with identical features may have been arrived at from different paths.
         """
-        return (self.position, self.dirty_locations) 
+        return (self.cell, self.dirty_mask) 
 
     # Override
     def __str__(self) -> str:
@@ -117,7 +164,7 @@ class SpotlessRoombaState(RoombaState):
         """Returns if a goal (terminal) state.
         If there are no more dirty locations, the roomba has finished cleaning!
         """
-        return len(self.dirty_locations) == 0
+        return self.dirty_mask == 0
 
     # Override
     def get_next_state(self, action : RoombaAction) -> SpotlessRoombaState:
@@ -126,17 +173,23 @@ class SpotlessRoombaState(RoombaState):
 
         -- action is assumed legal (is_legal_action called before)
         """
-        new_pos = action.applyTo(self.position)
-        step_cost = TRANSITION_COSTS[self.get_terrain(new_pos)]
+        problem = self.problem
+        new_cell = self.cell + action.row * problem.width + action.col
+        # Dirty terrain costs the same as its clean counterpart, so the step cost comes from the (clean) table.
         # If moving onto a dirty spot, it gets cleaned!
         return SpotlessRoombaState( 
-            dirty_locations = tuple(x for x in self.dirty_locations if x != new_pos) 
-                                if new_pos in self.dirty_locations 
-                                else self.dirty_locations,
-            position = new_pos,
-            grid = self.grid, 
+            dirty_mask = self.dirty_mask & ~problem.dirty_bits[new_cell],
+            cell = new_cell,
+            problem = problem, 
             last_action = action,
             parent = self,
             depth = self.depth + 1,
-            path_cost = self.path_cost + step_cost)
+            path_cost = self.path_cost + problem.costs[new_cell])
+
 
+    # Cleaning can't be undone, and any position can finish the cleaning, so (unlike a RoombaState)
+    # searching backwards from the goals isn't supported.
+    get_goal_states = StateNode.get_goal_states
+    get_previous_states = StateNode.get_previous_states
+    # Nor is jump point search, since every dirty spot is visited along the way rather than being a goal by itself.
+    get_jump_points = StateNode.get_jump_points